@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén local de frases de mindfulness (SQLite)
+Corpus de solo-añadir con todas las frases generadas: tema, fecha y si ya se
+usaron en un video. El generador de frases guarda aquí lotes de muchos temas
+de una vez y el generador de videos saca de aquí un conjunto (tema + 3
+frases) por video, así un día de contenido se genera con unas pocas llamadas
+a la API
+
+Antes de guardar se descartan las frases repetidas:
+- Exactas: hash del texto normalizado (minúsculas, sin tildes ni signos) con
+  índice único
+- Casi iguales: firma MinHash de los 5-gramas de caracteres, indexada por
+  bandas (LSH). Solo se comparan las frases que comparten alguna banda, así
+  el coste de cada inserción no crece con el tamaño del corpus
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+
+RUTA_DEFAULT = os.getenv(
+    "MINDFULNESS_ALMACEN",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)) or ".", "frases.db")
+)
+
+# MinHash: NUM_PERMUTACIONES = BANDAS * FILAS_POR_BANDA. Con 16 bandas de 4
+# filas, dos frases con similitud 0.6 comparten alguna banda el 89% de las
+# veces (0.7: 99%) y dos frases sin relación casi nunca
+BANDAS = 16
+FILAS_POR_BANDA = 4
+NUM_PERMUTACIONES = BANDAS * FILAS_POR_BANDA
+TAMANIO_SHINGLE = 5
+UMBRAL_SIMILITUD = 0.6
+
+# Estados de una frase (columna usada)
+PENDIENTE, USADA, RESERVADA = 0, 1, 2
+# Una reserva sin confirmar ni liberar más antigua que esto (el proceso que
+# renderizaba murió) vuelve a quedar pendiente
+RESERVA_MAX_S = 3600
+
+# Permutaciones fijas (a * x + b) mod p: las firmas guardadas siguen valiendo
+# entre ejecuciones. Con p < 2^31 y x < 2^32 el producto cabe en uint64
+_PRIMO = np.uint64((1 << 31) - 1)
+_rng = random.Random(20240208)
+_A = np.array([_rng.randrange(1, int(_PRIMO)) for _ in range(NUM_PERMUTACIONES)], dtype=np.uint64)[:, None]
+_B = np.array([_rng.randrange(0, int(_PRIMO)) for _ in range(NUM_PERMUTACIONES)], dtype=np.uint64)[:, None]
+del _rng
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes, sin signos de puntuación y con espacios simples"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r'[^\w\s]', ' ', texto)
+    return ' '.join(texto.split())
+
+
+def hash_texto(texto):
+    """Hash del texto normalizado (detecta duplicados exactos)"""
+    return hashlib.sha256(normalizar(texto).encode('utf-8')).hexdigest()[:32]
+
+
+def firma_minhash(texto):
+    """
+    Firma MinHash de los 5-gramas de caracteres del texto normalizado
+
+    Returns:
+        np.ndarray: NUM_PERMUTACIONES enteros uint32
+    """
+    normal = normalizar(texto)
+    if len(normal) <= TAMANIO_SHINGLE:
+        shingles = {normal}
+    else:
+        shingles = {normal[i:i + TAMANIO_SHINGLE] for i in range(len(normal) - TAMANIO_SHINGLE + 1)}
+    valores = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # Todas las permutaciones a la vez: (NUM_PERMUTACIONES, shingles) y mínimo por fila
+    return ((_A * valores[None, :] + _B) % _PRIMO).min(axis=1).astype(np.uint32)
+
+
+def firma_desde_blob(blob):
+    """Firma guardada en la base (bytes) como array"""
+    return np.frombuffer(blob, dtype=np.uint32)
+
+
+def similitud(firma_a, firma_b):
+    """Similitud de Jaccard estimada entre dos firmas MinHash (0 a 1)"""
+    return np.count_nonzero(firma_a == firma_b) / NUM_PERMUTACIONES
+
+
+def claves_bandas(firma):
+    """Una clave entera por banda (banda en los bits altos, hash de sus filas en los bajos)"""
+    claves = []
+    for banda in range(BANDAS):
+        filas = firma[banda * FILAS_POR_BANDA:(banda + 1) * FILAS_POR_BANDA]
+        claves.append((banda << 32) | zlib.crc32(filas.tobytes()))
+    return claves
+
+
+class AlmacenFrases:
+    """
+    Corpus de frases por tema con marca de usada e índices de duplicados
+
+    Las frases nunca se borran ni se reescriben: lo único que cambia es la
+    marca de usada. El generador de frases y el de videos pueden ser procesos
+    distintos: cada toma de un conjunto es una transacción que bloquea la base
+    para escribir, así dos videos nunca reciben las mismas frases.
+
+    El generador de videos reserva el conjunto mientras renderiza y solo lo
+    marca como usado cuando el video se exportó; si falla, lo libera:
+        tema, frases, ids = almacen.reservar_conjunto(3)
+        ...
+        almacen.confirmar_reserva(ids)   # o almacen.liberar_reserva(ids)
+    """
+
+    def __init__(self, ruta=None, umbral_similitud=UMBRAL_SIMILITUD):
+        """
+        Args:
+            ruta (str): Archivo SQLite (default: frases.db junto al script o $MINDFULNESS_ALMACEN)
+            umbral_similitud (float): Similitud a partir de la cual una frase se considera repetida
+        """
+        self.ruta = ruta or RUTA_DEFAULT
+        self.umbral_similitud = umbral_similitud
+        directorio = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(directorio, exist_ok=True)
+
+        # Transacciones explícitas (BEGIN IMMEDIATE) y una conexión compartida entre hilos
+        self.conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None,
+                                        check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self._crear_tablas()
+
+    def _crear_tablas(self):
+        with self._lock:
+            self.conexion.executescript("""
+                CREATE TABLE IF NOT EXISTS frases (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tema TEXT NOT NULL,
+                    texto TEXT NOT NULL,
+                    fecha TEXT NOT NULL,
+                    usada INTEGER NOT NULL DEFAULT 0,
+                    hash TEXT NOT NULL,
+                    firma BLOB NOT NULL,
+                    reservada REAL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_frases_hash ON frases (hash);
+                CREATE INDEX IF NOT EXISTS idx_frases_pendientes ON frases (usada, tema);
+                CREATE TABLE IF NOT EXISTS bandas (
+                    clave INTEGER NOT NULL,
+                    frase_id INTEGER NOT NULL,
+                    PRIMARY KEY (clave, frase_id)
+                ) WITHOUT ROWID;
+            """)
+
+    def _es_repetida(self, h, firma, claves):
+        """Duplicado exacto (hash) o casi igual (candidatos LSH verificados con la firma)"""
+        if self.conexion.execute("SELECT 1 FROM frases WHERE hash = ?", (h,)).fetchone():
+            return True
+
+        marcadores = ",".join("?" * len(claves))
+        candidatos = self.conexion.execute(
+            f"SELECT DISTINCT f.firma FROM bandas b JOIN frases f ON f.id = b.frase_id "
+            f"WHERE b.clave IN ({marcadores})", claves
+        ).fetchall()
+        for (blob,) in candidatos:
+            if similitud(firma, firma_desde_blob(blob)) >= self.umbral_similitud:
+                return True
+        return False
+
+    def filtrar_nuevas(self, frases):
+        """
+        Frases que no están en el corpus ni repetidas entre sí (en el orden original)
+
+        No guarda nada: sirve para decidir si hace falta pedir más frases.
+        """
+        nuevas, vistas = [], []
+        with self._lock:
+            for frase in frases:
+                if not isinstance(frase, str) or not frase.strip():
+                    continue
+                h, firma = hash_texto(frase), firma_minhash(frase)
+                if self._es_repetida(h, firma, claves_bandas(firma)):
+                    continue
+                if any(h == h2 or similitud(firma, f2) >= self.umbral_similitud for h2, f2 in vistas):
+                    continue
+                vistas.append((h, firma))
+                nuevas.append(frase)
+        return nuevas
+
+    def agregar_lote(self, frases_por_tema, usadas=False):
+        """
+        Añade las frases de varios temas en una sola transacción, descartando repetidas
+
+        Args:
+            frases_por_tema (dict): {tema: [frase, ...]}
+            usadas (bool): Guardarlas ya marcadas como usadas (p.ej. al importar historial)
+
+        Returns:
+            int: Frases guardadas (las repetidas no cuentan)
+        """
+        fecha = datetime.now().isoformat()
+        guardadas = 0
+
+        with self._lock:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            try:
+                for tema, frases in frases_por_tema.items():
+                    for frase in frases:
+                        if not isinstance(frase, str) or not frase.strip():
+                            continue
+                        frase = frase.strip()
+                        h, firma = hash_texto(frase), firma_minhash(frase)
+                        claves = claves_bandas(firma)
+                        # Dentro del lote también: las ya insertadas son visibles en la transacción
+                        if self._es_repetida(h, firma, claves):
+                            continue
+
+                        cursor = self.conexion.execute(
+                            "INSERT INTO frases (tema, texto, fecha, usada, hash, firma) VALUES (?, ?, ?, ?, ?, ?)",
+                            (tema, frase, fecha, USADA if usadas else PENDIENTE, h, firma.tobytes())
+                        )
+                        self.conexion.executemany(
+                            "INSERT OR IGNORE INTO bandas (clave, frase_id) VALUES (?, ?)",
+                            [(c, cursor.lastrowid) for c in claves]
+                        )
+                        guardadas += 1
+                self.conexion.execute("COMMIT")
+            except Exception:
+                self.conexion.execute("ROLLBACK")
+                raise
+        return guardadas
+
+    def importar_json(self, ruta, usadas=True):
+        """
+        Añade al corpus las frases de un mindfulness.json ({"tema", "frases"})
+
+        Por defecto se marcan como usadas: el JSON es lo último que se convirtió en video.
+
+        Returns:
+            int: Frases nuevas guardadas
+        """
+        with open(ruta, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return self.agregar_lote({data.get('tema', 'mindfulness'): data.get('frases', [])}, usadas=usadas)
+
+    def _sacar_conjunto(self, num_frases, marca):
+        """(tema, frases, ids) del conjunto pendiente más antiguo, marcándolo con `marca` (None = solo consultar)"""
+        with self._lock:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            try:
+                ahora = time.time()
+                if marca is not None:
+                    self.conexion.execute(
+                        "UPDATE frases SET usada = ?, reservada = NULL WHERE usada = ? AND reservada < ?",
+                        (PENDIENTE, RESERVADA, ahora - RESERVA_MAX_S)
+                    )
+
+                fila = self.conexion.execute("""
+                    SELECT tema FROM frases WHERE usada = ?
+                    GROUP BY tema HAVING COUNT(*) >= ?
+                    ORDER BY MIN(id) LIMIT 1
+                """, (PENDIENTE, num_frases)).fetchone()
+
+                if fila is None:
+                    self.conexion.execute("COMMIT")
+                    return None
+
+                tema = fila[0]
+                filas = self.conexion.execute(
+                    "SELECT id, texto FROM frases WHERE usada = ? AND tema = ? ORDER BY id LIMIT ?",
+                    (PENDIENTE, tema, num_frases)
+                ).fetchall()
+
+                if marca is not None:
+                    self.conexion.executemany(
+                        "UPDATE frases SET usada = ?, reservada = ? WHERE id = ?",
+                        [(marca, ahora if marca == RESERVADA else None, id_frase) for id_frase, _ in filas]
+                    )
+                self.conexion.execute("COMMIT")
+            except Exception:
+                self.conexion.execute("ROLLBACK")
+                raise
+
+        return tema, [texto for _, texto in filas], [id_frase for id_frase, _ in filas]
+
+    def tomar_conjunto(self, num_frases=3, consumir=True):
+        """
+        Saca el conjunto pendiente más antiguo: un tema con num_frases frases sin usar
+
+        Args:
+            num_frases (int): Frases por conjunto
+            consumir (bool): Marcar las frases como usadas (False = solo consultar)
+
+        Returns:
+            tuple: (tema, frases) o None si no queda ningún conjunto completo
+        """
+        conjunto = self._sacar_conjunto(num_frases, USADA if consumir else None)
+        return conjunto[:2] if conjunto else None
+
+    def reservar_conjunto(self, num_frases=3):
+        """
+        Aparta el conjunto pendiente más antiguo sin gastarlo todavía
+
+        Nadie más lo recibe mientras esté reservado; si no se confirma ni se
+        libera en RESERVA_MAX_S segundos vuelve a estar pendiente.
+
+        Returns:
+            tuple: (tema, frases, ids) o None si no queda ningún conjunto completo
+        """
+        return self._sacar_conjunto(num_frases, RESERVADA)
+
+    def _cerrar_reserva(self, ids, estado):
+        with self._lock:
+            self.conexion.execute("BEGIN IMMEDIATE")
+            try:
+                self.conexion.executemany(
+                    "UPDATE frases SET usada = ?, reservada = NULL WHERE id = ? AND usada = ?",
+                    [(estado, id_frase, RESERVADA) for id_frase in ids]
+                )
+                self.conexion.execute("COMMIT")
+            except Exception:
+                self.conexion.execute("ROLLBACK")
+                raise
+
+    def confirmar_reserva(self, ids):
+        """Marca como usadas las frases de una reserva (el video ya se exportó)"""
+        self._cerrar_reserva(ids, USADA)
+
+    def liberar_reserva(self, ids):
+        """Devuelve a pendientes las frases de una reserva (el video falló)"""
+        self._cerrar_reserva(ids, PENDIENTE)
+
+    def conjuntos_disponibles(self, num_frases=3):
+        """Número de conjuntos completos que quedan sin usar"""
+        with self._lock:
+            fila = self.conexion.execute("""
+                SELECT COALESCE(SUM(n / ?), 0) FROM (
+                    SELECT COUNT(*) AS n FROM frases WHERE usada = ? GROUP BY tema
+                )
+            """, (num_frases, PENDIENTE)).fetchone()
+        return fila[0]
+
+    def estadisticas(self):
+        """Totales del corpus: frases, usadas, reservadas, pendientes y temas"""
+        with self._lock:
+            total, usadas, reservadas, temas = self.conexion.execute(
+                "SELECT COUNT(*), COALESCE(SUM(usada = ?), 0), COALESCE(SUM(usada = ?), 0), "
+                "COUNT(DISTINCT tema) FROM frases", (USADA, RESERVADA)
+            ).fetchone()
+        return {"frases": total, "usadas": usadas, "reservadas": reservadas,
+                "pendientes": total - usadas - reservadas, "temas": temas}
+
+    def cerrar(self):
+        with self._lock:
+            self.conexion.close()
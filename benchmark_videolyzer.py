@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark reproducible y sin red de GeneradorVideoPexels
+
+Sustituye Pexels por un servidor HTTP local con medios de prueba, edge-tts por
+MP3 de prueba y Cloudinary por un stub, con semillas fijas. Mide cada etapa
+(recortar_a_vertical, crear_texto, aplicar_efecto, ajustar_video_vertical,
+exportación) y generar_video de punta a punta, y compara contra una línea base
+
+Uso:
+  python benchmark_videolyzer.py                      # medir y comparar con la línea base
+  python benchmark_videolyzer.py --guardar-baseline   # guardar la medición como línea base
+  python benchmark_videolyzer.py --arranque           # solo comprobar el tiempo de 'import videolyzer'
+
+Los tiempos dependen de la máquina, así que la línea base no va en el
+repositorio: se guarda una vez en cada máquina donde se mide. Sin línea base
+el benchmark termina con error (código 2) en vez de dar por buena la medición
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from moviepy.config import get_setting
+from moviepy.editor import ImageClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from videolyzer import GeneradorVideoPexels
+from instrumentacion import rss_pico_mb
+
+
+RUTA_BASE = os.path.dirname(os.path.abspath(__file__))
+DIR_BENCH = os.path.join(RUTA_BASE, "benchmarks")
+DIR_FIXTURES = os.path.join(DIR_BENCH, "fixtures")
+BASELINE_DEFAULT = os.path.join(DIR_BENCH, "baseline.json")
+SEMILLA = 1234
+
+FRASES = {
+    "tema": "Respiración consciente",
+    "frases": [
+        "Cada inhalación es una invitación a volver al momento presente con calma",
+        "Al exhalar sueltas lo que ya no necesitas y dejas espacio para la paz",
+        "La respiración consciente es el puente entre tu cuerpo y tu mente"
+    ]
+}
+
+# Métricas donde más es mejor (el resto: menos es mejor)
+MAYOR_ES_MEJOR = {"videos_por_hora", "fps_codificacion", "fps"}
+
+
+# ========== FIXTURES ==========
+
+def _ffmpeg(*args):
+    subprocess.run([get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error', *args], check=True)
+
+
+def preparar_fixtures():
+    """Genera (una sola vez) fotos, clips y audios de prueba deterministas"""
+    os.makedirs(DIR_FIXTURES, exist_ok=True)
+    rng = np.random.default_rng(SEMILLA)
+
+    for i, (w, h) in enumerate([(1200, 1800), (1600, 1200), (2000, 3000)]):
+        ruta = os.path.join(DIR_FIXTURES, f"foto_{i}.jpg")
+        if not os.path.exists(ruta):
+            # Gradiente + ruido: comprime y se redimensiona como una foto real
+            y, x = np.mgrid[0:h, 0:w]
+            base = np.stack([x * 255 // w, y * 255 // h, (x + y) * 255 // (w + h)], axis=2)
+            ruido = rng.integers(0, 40, (h, w, 3))
+            Image.fromarray(np.clip(base + ruido, 0, 255).astype(np.uint8)).save(ruta, quality=90)
+
+    for i, (w, h, dur) in enumerate([(720, 1280, 6), (1080, 1920, 4), (1920, 1080, 8)]):
+        ruta = os.path.join(DIR_FIXTURES, f"video_{i}.mp4")
+        if not os.path.exists(ruta):
+            _ffmpeg('-f', 'lavfi', '-i', f'testsrc2=size={w}x{h}:rate=30:duration={dur}',
+                    '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p', ruta)
+
+    for segundos in (2, 3, 4, 5):
+        ruta = os.path.join(DIR_FIXTURES, f"voz_{segundos}s.mp3")
+        if not os.path.exists(ruta):
+            # Mismo formato que edge-tts: 24 kHz mono 48 kbps
+            _ffmpeg('-f', 'lavfi', '-i', f'sine=frequency=180:duration={segundos}',
+                    '-ar', '24000', '-ac', '1', '-b:a', '48k', ruta)
+
+
+# ========== SUSTITUTOS LOCALES ==========
+
+class ServidorPexelsLocal:
+    """Sirve las fixtures por HTTP y responde búsquedas con el formato de la API de Pexels"""
+
+    def __init__(self):
+        manejador = functools.partial(_ManejadorSilencioso, directory=DIR_FIXTURES)
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), manejador)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+
+    def buscar(self, url, params):
+        """Reemplazo de GeneradorVideoPexels._buscar_pexels"""
+        n = params.get("per_page", 1)
+        if "videos" in url:
+            tamanios = [(720, 1280, 6), (1080, 1920, 4), (1920, 1080, 8)]
+            return {"videos": [
+                {
+                    "id": 9000 + i, "duration": dur,
+                    "video_files": [{
+                        "id": 9100 + i, "width": w, "height": h, "fps": 30,
+                        "quality": "hd", "file_type": "video/mp4",
+                        "link": f"{self.base}/video_{i}.mp4"
+                    }]
+                }
+                for i, (w, h, dur) in list(enumerate(tamanios))[:n]
+            ]}
+        return {"photos": [
+            {"id": 8000 + i, "src": {"large2x": f"{self.base}/foto_{i % 3}.jpg"}}
+            for i in range(n)
+        ]}
+
+
+class _ManejadorSilencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def _tts_local(self, textos, rutas):
+    """Reemplazo de SintetizadorVoz._edge_lote: copia un MP3 de prueba según la longitud"""
+    for texto, ruta in zip(textos, rutas):
+        segundos = min(5, max(2, len(texto) // 20))
+        shutil.copy(os.path.join(DIR_FIXTURES, f"voz_{segundos}s.mp3"), ruta)
+    return [None] * len(textos)
+
+
+def _subida_local(self, video_path, tema):
+    """Reemplazo de Cloudinary: no sube nada"""
+    return {"secure_url": "file://" + os.path.abspath(video_path), "public_id": "benchmark"}
+
+
+def crear_generador(cache_dir):
+    """GeneradorVideoPexels conectado a los sustitutos locales"""
+    # La caché de medios (y la de TTS, que cuelga de ella) va a un directorio desechable
+    os.environ["VIDEOLYZER_CACHE_DIR"] = cache_dir
+    gen = GeneradorVideoPexels(api_key="benchmark", usar_cloudinary=False)
+    gen.voz._edge_lote = _tts_local.__get__(gen.voz)
+    gen.subir_a_cloudinary = _subida_local.__get__(gen)
+    return gen
+
+
+# ========== MEDICIONES ==========
+
+def medir(funcion, repeticiones):
+    """
+    Mediana de segundos y pico de memoria Python (MB) de funcion()
+
+    Los tiempos se toman sin tracemalloc (que frena mucho las asignaciones) y
+    la memoria en una pasada aparte.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        random.seed(SEMILLA)
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    random.seed(SEMILLA)
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(tiempos), round(pico / 1024 / 1024, 1)
+
+
+def fps_de(clip, segundos=2.0, fps=30):
+    """Fotogramas por segundo que se pueden extraer de un clip"""
+    n = int(segundos * fps)
+    inicio = time.perf_counter()
+    for k in range(n):
+        clip.get_frame(k / fps)
+    return n / (time.perf_counter() - inicio)
+
+
+def benchmark_etapas(gen, repeticiones):
+    resultados = {}
+    foto = Image.open(os.path.join(DIR_FIXTURES, "foto_2.jpg")).convert('RGB')
+    frase = FRASES["frases"][0]
+
+    seg, mem = medir(lambda: gen.recortar_a_vertical(foto), repeticiones)
+    resultados["recortar_a_vertical"] = {"segundos": round(seg, 4), "memoria_mb": mem}
+
+    def texto_en_frio():
+        gen.texto._capas.clear()
+        gen.crear_texto(frase, 3)
+    seg, mem = medir(texto_en_frio, repeticiones)
+    resultados["crear_texto"] = {"segundos": round(seg, 4), "memoria_mb": mem}
+
+    img_path = os.path.join(gen.temp_dir, "bench_foto.jpg")
+    gen.recortar_a_vertical(foto).save(img_path)
+    for efecto in gen.EFECTOS:
+        try:
+            clip = gen.aplicar_efecto(ImageClip(img_path, duration=3), efecto, 3)
+            resultados[f"aplicar_efecto.{efecto}"] = {"fps": round(fps_de(clip), 1)}
+        except Exception as e:
+            resultados[f"aplicar_efecto.{efecto}"] = {"error": repr(e)}
+
+    # Incluye abrir el clip (y decodificar el bucle), sobre un segmento entero de 10 s
+    for i in range(3):
+        ruta = os.path.join(DIR_FIXTURES, f"video_{i}.mp4")
+        try:
+            inicio = time.perf_counter()
+            clip = gen.ajustar_video_vertical(ruta, 10)
+            fps_de(clip, segundos=10)
+            segundos = time.perf_counter() - inicio
+            resultados[f"ajustar_video_vertical.{i}"] = {"fps": round(10 * 30 / segundos, 1)}
+            clip.close()
+        except Exception as e:
+            resultados[f"ajustar_video_vertical.{i}"] = {"error": repr(e)}
+
+    # Exportación de un segmento de 3 s con el perfil por defecto
+    spec = {
+        'texto': frase, 'audio': os.path.join(DIR_FIXTURES, "voz_3s.mp3"), 'duracion': 3.0,
+        'tipo': 'video', 'fuente': os.path.join(DIR_FIXTURES, "video_0.mp4"), 'efecto': None
+    }
+    salida = os.path.join(gen.temp_dir, "bench_export.mp4")
+
+    def exportar():
+        clip = gen.construir_segmento(spec)
+        clip.write_videofile(salida, **gen.parametros_exportacion())
+        clip.close()
+    seg, mem = medir(exportar, repeticiones)
+    resultados["exportar"] = {
+        "segundos": round(seg, 3),
+        "fps_codificacion": round(3.0 * GeneradorVideoPexels.FPS_SALIDA / seg, 1),
+        "memoria_mb": mem
+    }
+    return resultados
+
+
+def benchmark_video_completo(gen, repeticiones, carpeta, **kwargs):
+    tiempos = []
+    for n in range(repeticiones):
+        random.seed(SEMILLA)
+        np.random.seed(SEMILLA)
+        salida = os.path.join(carpeta, f"bench_video_{n}.mp4")
+        inicio = time.perf_counter()
+        gen.generar_video(salida, tema=FRASES["tema"], frases=FRASES["frases"], **kwargs)
+        tiempos.append(time.perf_counter() - inicio)
+
+    seg = statistics.median(tiempos)
+    reporte = gen.metricas.reporte()
+    # Los segmento_* de --paralelo se solapan: contar el tramo real desde que
+    # empieza la primera codificación hasta que termina el concat
+    codificacion = [e for e in reporte["etapas"] if e["etapa"] in ("exportar", "concat")
+                    or e["etapa"].startswith("segmento_")]
+    exportar = (max(e["inicio_s"] + e["wall_s"] for e in codificacion)
+                - min(e["inicio_s"] for e in codificacion)) if codificacion else 0
+    # Solo la cabecera: sin abrir un lector de ffmpeg que habría que cerrar
+    duracion = ffmpeg_parse_infos(salida)['duration']
+    return {
+        "segundos": round(seg, 2),
+        "videos_por_hora": round(3600 / seg, 1),
+        "fps_codificacion": round(duracion * GeneradorVideoPexels.FPS_SALIDA / exportar, 1) if exportar else None,
+        "rss_pico_mb": rss_pico_mb()
+    }
+
+
+# ========== ARRANQUE ==========
+
+# Módulos que 'import videolyzer' no debe cargar (se importan al renderizar o subir)
+MODULOS_PESADOS = ("moviepy", "imageio", "numpy", "PIL", "requests", "edge_tts", "gtts", "cloudinary")
+PRESUPUESTO_ARRANQUE_S = 0.3
+
+_CODIGO_ARRANQUE = """
+import json, sys, time
+inicio = time.perf_counter()
+import videolyzer
+segundos = time.perf_counter() - inicio
+print(json.dumps({"segundos": segundos, "pesados": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def medir_arranque(repeticiones):
+    """Mediana de 'import videolyzer' en intérpretes limpios y módulos pesados cargados"""
+    tiempos, pesados = [], set()
+    for _ in range(repeticiones):
+        resultado = subprocess.run(
+            [sys.executable, '-c', _CODIGO_ARRANQUE % (MODULOS_PESADOS,)],
+            cwd=RUTA_BASE, capture_output=True, text=True, check=True
+        )
+        datos = json.loads(resultado.stdout.strip().splitlines()[-1])
+        tiempos.append(datos["segundos"])
+        pesados.update(datos["pesados"])
+    return {"segundos": round(statistics.median(tiempos), 4), "pesados": sorted(pesados)}
+
+
+def comprobar_arranque(repeticiones, presupuesto):
+    """Devuelve 0 si el import cabe en el presupuesto y no arrastra módulos pesados"""
+    arranque = medir_arranque(repeticiones)
+    print(f"⏱️  import videolyzer: {arranque['segundos'] * 1000:.0f} ms "
+          f"(presupuesto {presupuesto * 1000:.0f} ms)")
+    errores = []
+    if arranque["segundos"] > presupuesto:
+        errores.append("supera el presupuesto de arranque")
+    if arranque["pesados"]:
+        errores.append(f"importa {', '.join(arranque['pesados'])} al arrancar")
+    if errores:
+        print(f"❌ import videolyzer {' y '.join(errores)}")
+        return 1
+    print("✅ Arranque dentro del presupuesto")
+    return 0
+
+
+# ========== LÍNEA BASE ==========
+
+def comparar(actual, baseline, tolerancia):
+    """Imprime las diferencias y devuelve la lista de regresiones"""
+    regresiones = []
+    print(f"\n{'='*70}")
+    print(f"📊 COMPARACIÓN CON LA LÍNEA BASE (tolerancia {tolerancia:.0%})")
+    print(f"{'='*70}")
+    for grupo, metricas in actual.items():
+        for nombre, valores in metricas.items():
+            base = baseline.get(grupo, {}).get(nombre, {})
+            for clave, valor in valores.items():
+                anterior = base.get(clave)
+                if not isinstance(valor, (int, float)) or not isinstance(anterior, (int, float)) or not anterior:
+                    continue
+                cambio = (valor - anterior) / anterior
+                peor = -cambio if clave in MAYOR_ES_MEJOR else cambio
+                marca = "❌" if peor > tolerancia else ("✅" if peor < -tolerancia else "  ")
+                print(f"{marca} {grupo}.{nombre}.{clave:<18} {anterior:>10} → {valor:<10} ({cambio:+.1%})")
+                if peor > tolerancia:
+                    regresiones.append(f"{grupo}.{nombre}.{clave}")
+    print(f"{'='*70}\n")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offline de GeneradorVideoPexels')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por medición (mediana)')
+    parser.add_argument('--baseline', default=BASELINE_DEFAULT, help='Archivo JSON de línea base')
+    parser.add_argument('--guardar-baseline', action='store_true', help='Guardar esta medición como línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.15, help='Regresión máxima tolerada (0.15 = 15%%)')
+    parser.add_argument('--salida', default=None, help='Guardar también los resultados en este JSON')
+    parser.add_argument('--solo-etapas', action='store_true', help='No medir generar_video completo')
+    parser.add_argument('--arranque', action='store_true',
+                        help="Solo comprobar el tiempo de 'import videolyzer' contra el presupuesto")
+    parser.add_argument('--presupuesto-arranque', type=float, default=PRESUPUESTO_ARRANQUE_S,
+                        help='Segundos máximos de import videolyzer (default: %(default)s)')
+    args = parser.parse_args()
+    
+    if args.arranque:
+        return comprobar_arranque(max(args.repeticiones, 5), args.presupuesto_arranque)
+
+    # Comprobarlo antes de medir: sin línea base no se detecta ninguna regresión
+    if not args.guardar_baseline and not os.path.exists(args.baseline):
+        print(f"❌ No hay línea base en {args.baseline}: guárdala primero con --guardar-baseline")
+        return 2
+
+    random.seed(SEMILLA)
+    np.random.seed(SEMILLA)
+    preparar_fixtures()
+
+    trabajo = tempfile.mkdtemp(prefix="bench_videolyzer_")
+    resultados = {}
+    try:
+        with ServidorPexelsLocal() as pexels:
+            gen = crear_generador(os.path.join(trabajo, "cache"))
+            gen._buscar_pexels = pexels.buscar
+
+            print("⏱️  Midiendo etapas...")
+            resultados["etapas"] = benchmark_etapas(gen, args.repeticiones)
+
+            if not args.solo_etapas:
+                print("⏱️  Midiendo generar_video de punta a punta (caché fría y caliente)...")
+                gen_frio = crear_generador(os.path.join(trabajo, "cache_fria"))
+                gen_frio._buscar_pexels = pexels.buscar
+                resultados["video"] = {
+                    "frio": benchmark_video_completo(gen_frio, 1, trabajo),
+                    "caliente": benchmark_video_completo(gen_frio, args.repeticiones, trabajo),
+                    "paralelo": benchmark_video_completo(gen_frio, args.repeticiones, trabajo, paralelo=True)
+                }
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"💾 Línea base guardada en {args.baseline}")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regresiones = comparar(resultados, baseline, args.tolerancia)
+    if regresiones:
+        print(f"❌ {len(regresiones)} regresiones: {', '.join(regresiones)}")
+        return 1
+    print("✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
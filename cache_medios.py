@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de medios en disco
+Guarda fotos y videos de Pexels (y otros recursos) direccionados por una clave
+estable (ID del recurso + rendición) con límite de tamaño y expulsión LRU
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+
+class CacheMedios:
+    """
+    Caché en disco direccionada por clave con expulsión LRU
+
+    Cada entrada se guarda como <sha256(clave)>.<extension> dentro del
+    directorio de la caché. Un índice JSON lleva el tamaño, el último acceso
+    y metadatos opcionales de cada entrada.
+    """
+
+    MAX_MB_DEFAULT = int(os.getenv("VIDEOLYZER_CACHE_MB", "1024"))
+
+    def __init__(self, directorio=None, max_mb=None):
+        """
+        Args:
+            directorio (str): Carpeta de la caché (default: .cache_medios junto al script)
+            max_mb (int): Tamaño máximo en MB antes de expulsar entradas antiguas
+        """
+        ruta_base = os.path.dirname(os.path.abspath(__file__)) or "."
+        self.directorio = directorio or os.getenv(
+            "VIDEOLYZER_CACHE_DIR", os.path.join(ruta_base, ".cache_medios")
+        )
+        self.max_bytes = (max_mb if max_mb is not None else self.MAX_MB_DEFAULT) * 1024 * 1024
+        os.makedirs(self.directorio, exist_ok=True)
+        self.indice_path = os.path.join(self.directorio, "indice.json")
+        self.indice = self._cargar_indice()
+        # La caché se comparte entre los hilos de descarga
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def clave(*partes):
+        """Clave estable (no depende de hash() de Python) a partir de sus partes"""
+        texto = "|".join(str(p) for p in partes)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _cargar_indice(self):
+        try:
+            with open(self.indice_path, 'r', encoding='utf-8') as f:
+                indice = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        # Descartar entradas cuyo archivo ya no existe
+        return {
+            k: v for k, v in indice.items()
+            if os.path.exists(os.path.join(self.directorio, v["archivo"]))
+        }
+
+    def _guardar_indice(self):
+        tmp = self.indice_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.indice, f)
+        os.replace(tmp, self.indice_path)
+
+    def ruta(self, clave, extension=""):
+        """Ruta en disco que corresponde a una clave"""
+        return os.path.join(self.directorio, clave + extension)
+
+    def obtener(self, clave, max_edad=None):
+        """
+        Devuelve la ruta del archivo cacheado o None si no existe
+
+        Args:
+            clave (str): Clave generada con CacheMedios.clave()
+            max_edad (float): Segundos máximos desde que se guardó (None = sin caducidad)
+        """
+        with self._lock:
+            entrada = self.indice.get(clave)
+            if not entrada:
+                return None
+
+            path = os.path.join(self.directorio, entrada["archivo"])
+            if not os.path.exists(path):
+                self.indice.pop(clave, None)
+                return None
+
+            if max_edad is not None and time.time() - entrada.get("creado", 0) > max_edad:
+                return None
+
+            entrada["ultimo_acceso"] = time.time()
+            self._guardar_indice()
+            return path
+
+    def meta(self, clave):
+        """Metadatos guardados junto a la entrada (dict vacío si no hay)"""
+        with self._lock:
+            entrada = self.indice.get(clave)
+            return dict(entrada.get("meta", {})) if entrada else {}
+
+    def guardar_bytes(self, clave, datos, extension="", meta=None):
+        """Guarda bytes en la caché y devuelve la ruta final"""
+        path = self.ruta(clave, extension)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(datos)
+        os.replace(tmp, path)
+        return self._registrar(clave, path, meta)
+
+    def guardar_archivo(self, clave, origen, extension="", meta=None):
+        """Mueve un archivo ya descargado dentro de la caché y devuelve la ruta final"""
+        path = self.ruta(clave, extension)
+        # shutil.move funciona aunque el origen esté en otro sistema de archivos (p.ej. /tmp)
+        shutil.move(origen, path)
+        return self._registrar(clave, path, meta)
+
+    def _registrar(self, clave, path, meta):
+        ahora = time.time()
+        with self._lock:
+            self.indice[clave] = {
+                "archivo": os.path.basename(path),
+                "bytes": os.path.getsize(path),
+                "creado": ahora,
+                "ultimo_acceso": ahora,
+                "meta": meta or {}
+            }
+            self._expulsar(proteger=clave)
+            self._guardar_indice()
+        return path
+
+    def tamanio_total(self):
+        with self._lock:
+            return sum(e["bytes"] for e in self.indice.values())
+
+    def _expulsar(self, proteger=None):
+        """Elimina las entradas menos usadas recientemente hasta bajar del límite"""
+        total = self.tamanio_total()
+        if total <= self.max_bytes:
+            return
+
+        for clave, entrada in sorted(self.indice.items(), key=lambda kv: kv[1]["ultimo_acceso"]):
+            if total <= self.max_bytes:
+                break
+            if clave == proteger:
+                continue
+            try:
+                os.remove(os.path.join(self.directorio, entrada["archivo"]))
+            except OSError:
+                # En Windows un archivo abierto no se puede borrar; se reintenta la próxima vez
+                continue
+            total -= entrada["bytes"]
+            del self.indice[clave]
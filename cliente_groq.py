@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP persistente para la API de chat de Groq
+Una sola requests.Session con keep-alive y pool de conexiones (sin DNS, TCP
+ni TLS nuevos en cada llamada del modo continuo), cabeceras fijadas una vez,
+cuerpos JSON ya serializados por prompt y, opcionalmente, respuesta en
+streaming que se va interpretando a medida que llega
+"""
+
+import json
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ExtractorFrases:
+    """
+    Saca las frases de un JSON que llega por trozos, sin esperar al final
+
+    Reconoce cualquier array bajo la clave "frases" y, si el objeto que lo
+    contiene tiene "tema" antes, lo asocia:
+        {"frases": ["a", "b"]}                                 -> (None, "a"), (None, "b")
+        {"temas": [{"tema": "T", "frases": ["a"]}]}            -> ("T", "a")
+    """
+
+    def __init__(self):
+        self.pila = []          # Contenedores abiertos: dicts con 'tipo' '{' o '['
+        self.en_cadena = False
+        self.escape = False
+        self.cadena = []
+
+    def alimentar(self, texto):
+        """
+        Procesa un trozo de texto
+
+        Returns:
+            list: (tema, frase) de las frases que se completaron en este trozo
+        """
+        frases = []
+        for c in texto:
+            if self.en_cadena:
+                if self.escape:
+                    self.escape = False
+                    self.cadena.append(c)
+                elif c == '\\':
+                    self.escape = True
+                    self.cadena.append(c)
+                elif c == '"':
+                    self.en_cadena = False
+                    frase = self._fin_cadena(''.join(self.cadena))
+                    if frase:
+                        frases.append(frase)
+                else:
+                    self.cadena.append(c)
+            elif c == '"':
+                self.en_cadena = True
+                self.cadena = []
+            elif c == '{':
+                self.pila.append({'tipo': '{', 'clave': None, 'esperando_clave': True, 'tema': None})
+            elif c == '[':
+                padre = self.pila[-1] if self.pila else None
+                clave = padre['clave'] if padre and padre['tipo'] == '{' else None
+                self.pila.append({'tipo': '[', 'clave': clave})
+            elif c in '}]':
+                if self.pila:
+                    self.pila.pop()
+            elif c == ':':
+                if self.pila and self.pila[-1]['tipo'] == '{':
+                    self.pila[-1]['esperando_clave'] = False
+            elif c == ',':
+                if self.pila and self.pila[-1]['tipo'] == '{':
+                    self.pila[-1]['esperando_clave'] = True
+        return frases
+
+    def _fin_cadena(self, crudo):
+        try:
+            valor = json.loads('"' + crudo + '"')
+        except json.JSONDecodeError:
+            return None
+        if not self.pila:
+            return None
+
+        tope = self.pila[-1]
+        if tope['tipo'] == '{':
+            if tope['esperando_clave']:
+                tope['clave'] = valor
+            elif tope['clave'] == 'tema':
+                tope['tema'] = valor
+            return None
+
+        if tope['clave'] == 'frases':
+            objeto = self.pila[-2] if len(self.pila) > 1 else None
+            return (objeto['tema'] if objeto else None), valor
+        return None
+
+
+class ClienteGroq:
+    """
+    Llamadas a chat completions con respuesta JSON, limitador de tasa y reintentos
+
+    Ejemplo:
+        cliente = ClienteGroq(api_key, modelo, mensaje_sistema, limitador)
+        datos = cliente.completar_json(prompt, max_tokens=1500)
+        datos = cliente.completar_json(prompt, 1500, stream=True,
+                                       al_recibir=lambda tema, frase: print(frase))
+    """
+
+    URL = "https://api.groq.com/openai/v1/chat/completions"
+    MAX_CUERPOS = 256  # Cuerpos serializados que se guardan (uno por prompt distinto)
+
+    def __init__(self, api_key, modelo, mensaje_sistema, limitador=None, max_reintentos=4,
+                 timeout=30, conexiones=4, temperatura=1.3):
+        """
+        Args:
+            api_key (str): API key de Groq
+            modelo (str): Modelo de chat
+            mensaje_sistema (str): Mensaje de sistema fijo de todas las llamadas
+            limitador (LimitadorTasa): Cupo compartido (None = sin limitar)
+            max_reintentos (int): Reintentos ante 429, 5xx o errores de conexión
+            timeout (float): Segundos de espera de la respuesta
+            conexiones (int): Conexiones keep-alive del pool (>= llamadas simultáneas)
+            temperatura (float): Temperatura del modelo
+        """
+        self.modelo = modelo
+        self.mensaje_sistema = mensaje_sistema
+        self.limitador = limitador
+        self.max_reintentos = max_reintentos
+        self.timeout = timeout
+        self.temperatura = temperatura
+        self._cuerpos = {}
+
+        self.sesion = requests.Session()
+        self.sesion.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=conexiones)
+        self.sesion.mount("https://", adaptador)
+
+    def cuerpo(self, prompt, max_tokens, stream=False):
+        """
+        Cuerpo JSON de la petición ya serializado (se guarda por prompt)
+
+        En streaming no se pide response_format: el modo JSON de Groq no admite
+        stream, el formato lo fija el prompt y la respuesta se valida al final.
+        """
+        clave = (prompt, max_tokens, stream)
+        cuerpo = self._cuerpos.get(clave)
+        if cuerpo is None:
+            payload = {
+                "model": self.modelo,
+                "messages": [
+                    {"role": "system", "content": self.mensaje_sistema},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": self.temperatura,
+                "max_tokens": max_tokens
+            }
+            if stream:
+                payload["stream"] = True
+            else:
+                payload["response_format"] = {"type": "json_object"}  # Forzar respuesta JSON
+
+            cuerpo = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            if len(self._cuerpos) >= self.MAX_CUERPOS:
+                self._cuerpos.clear()
+            self._cuerpos[clave] = cuerpo
+        return cuerpo
+
+    def _pausar(self, intento, motivo, retry_after=None):
+        pausa = self.limitador.retroceso(intento, retry_after) if self.limitador else 2.0 * (2 ** intento)
+        print(f"⚠️ {motivo}, reintento {intento + 1}/{self.max_reintentos} en {pausa:.1f}s")
+        if self.limitador:
+            self.limitador.pausar(pausa)
+        else:
+            time.sleep(pausa)
+
+    def completar_json(self, prompt, max_tokens, stream=False, al_recibir=None):
+        """
+        Llamada con respuesta JSON
+
+        Pasa por el limitador de tasa: espera a tener cupo de peticiones y
+        tokens, y ante un 429 o un error del servidor reintenta con retroceso
+        exponencial respetando retry-after.
+
+        Args:
+            prompt (str): Mensaje del usuario
+            max_tokens (int): Tokens máximos de la respuesta
+            stream (bool): Recibir la respuesta por trozos
+            al_recibir (callable): f(tema, frase) por cada frase completa recibida en streaming
+
+        Returns:
+            dict: JSON devuelto por el modelo
+
+        Raises:
+            RuntimeError: Respuesta HTTP distinta de 200 (tras agotar los reintentos si aplica)
+        """
+        cuerpo = self.cuerpo(prompt, max_tokens, stream)
+        # Reserva pesimista (~3 caracteres por token + salida máxima); se corrige con el uso real
+        reservados = (len(self.mensaje_sistema) + len(prompt)) // 3 + max_tokens
+
+        for intento in range(self.max_reintentos + 1):
+            if self.limitador:
+                esperado = self.limitador.esperar(reservados)
+                if esperado >= 1:
+                    print(f"⏳ Cupo de Groq: esperando {esperado:.1f}s")
+
+            try:
+                response = self.sesion.post(self.URL, data=cuerpo, timeout=self.timeout, stream=stream)
+            except requests.RequestException as e:
+                if self.limitador:
+                    self.limitador.ajustar_tokens(reservados, 0)
+                if intento == self.max_reintentos:
+                    raise
+                self._pausar(intento, f"Error de conexión con Groq ({e})")
+                continue
+
+            if response.status_code == 200:
+                try:
+                    if stream:
+                        contenido, usados = self._leer_stream(response, al_recibir)
+                    else:
+                        data = response.json()
+                        contenido = data['choices'][0]['message']['content']
+                        usados = (data.get('usage') or {}).get('total_tokens')
+                finally:
+                    response.close()
+
+                if self.limitador:
+                    if usados is None:
+                        usados = (len(self.mensaje_sistema) + len(prompt) + len(contenido)) // 3
+                    self.limitador.ajustar_tokens(reservados, usados)
+                    self.limitador.actualizar(response.headers)
+                return self._parsear_json(contenido)
+
+            # Una petición rechazada no consume tokens
+            texto = response.text
+            response.close()
+            if self.limitador:
+                self.limitador.ajustar_tokens(reservados, 0)
+                self.limitador.actualizar(response.headers)
+
+            reintentable = response.status_code == 429 or response.status_code >= 500
+            if not reintentable or intento == self.max_reintentos:
+                raise RuntimeError(f"Error {response.status_code}: {texto}")
+
+            self._pausar(intento, f"Groq respondió {response.status_code}", response.headers.get('retry-after'))
+
+    @staticmethod
+    def _parsear_json(contenido):
+        """JSON de la respuesta; sin modo JSON (streaming) el modelo a veces lo envuelve en texto o ```json"""
+        try:
+            return json.loads(contenido)
+        except json.JSONDecodeError:
+            inicio, fin = contenido.find('{'), contenido.rfind('}')
+            if inicio < 0 or fin <= inicio:
+                raise
+            return json.loads(contenido[inicio:fin + 1])
+
+    @staticmethod
+    def _leer_stream(response, al_recibir=None):
+        """
+        Lee los eventos server-sent ('data: {...}') de una respuesta en streaming
+
+        Returns:
+            tuple: (contenido completo, tokens usados o None)
+        """
+        extractor = ExtractorFrases() if al_recibir else None
+        partes = []
+        usados = None
+
+        for linea in response.iter_lines(decode_unicode=False):
+            if not linea or not linea.startswith(b'data:'):
+                continue
+            datos = linea[5:].strip()
+            if datos == b'[DONE]':
+                break
+
+            evento = json.loads(datos)
+            for opcion in evento.get('choices', []):
+                trozo = (opcion.get('delta') or {}).get('content')
+                if trozo:
+                    partes.append(trozo)
+                    if extractor:
+                        for tema, frase in extractor.alimentar(trozo):
+                            al_recibir(tema, frase)
+
+            # Groq manda el uso en x_groq del último evento; OpenAI en 'usage'
+            uso = evento.get('usage') or (evento.get('x_groq') or {}).get('usage')
+            if uso:
+                usados = uso.get('total_tokens', usados)
+
+        return ''.join(partes), usados
+
+    def cerrar(self):
+        self.sesion.close()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decodificación de clips de stock directamente al formato vertical
+ffmpeg recorta al centro, escala y remuestrea a los FPS de salida al
+decodificar, así Python recibe fotogramas de 1080x1920 ya listos en vez de
+fotogramas HD/4K que había que recortar y redimensionar uno a uno. Los clips
+más cortos que el segmento se decodifican, recortan y escalan una sola vez a
+un intermedio compacto (H.264 de decodificación rápida ya a la resolución y
+los FPS de salida) y el bucle se sirve desde ahí
+"""
+
+import os
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+from moviepy.config import get_setting
+from moviepy.video.VideoClip import VideoClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+
+# Intermedio de los bucles: un búfer crudo rgb24 de un clip de 5 s a 1080x1920
+# ocuparía ~930 MB; en H.264 'fastdecode' casi sin pérdida son unos pocos MB
+PARAMETROS_INTERMEDIO = ['-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'fastdecode',
+                         '-crf', '12', '-pix_fmt', 'yuv420p']
+
+
+def filtro_vertical(resolucion, fps):
+    """
+    Filtro de ffmpeg: recortar al centro a la proporción de salida, escalar y fijar los FPS
+
+    Recortar antes de escalar evita ampliar el ancho completo de un video
+    horizontal para luego descartar la mayor parte.
+    """
+    ancho, alto = resolucion
+    return (f"crop='min(iw,ih*{ancho}/{alto})':'min(ih,iw*{alto}/{ancho})',"
+            f"scale={ancho}:{alto},setsar=1,fps={fps}")
+
+
+class LectorVertical:
+    """
+    Lee fotogramas rgb24 ya escalados y recortados de un proceso ffmpeg
+
+    Los fotogramas se piden en orden creciente al exportar; si se pide uno
+    anterior al último leído se relanza ffmpeg buscando ese instante.
+    """
+
+    def __init__(self, ruta, resolucion, fps, duracion, bucle=False, periodo=None):
+        """
+        Args:
+            ruta (str): Video de origen
+            resolucion (tuple): (ancho, alto) de salida
+            fps (int): Fotogramas por segundo de salida
+            duracion (float): Segundos a leer
+            bucle (bool): Repetir el origen dentro de ffmpeg hasta cubrir la duración
+            periodo (float): Duración del origen en bucle (para buscar dentro de una vuelta)
+        """
+        self.ruta = ruta
+        self.resolucion = resolucion
+        self.fps = fps
+        self.duracion = duracion
+        self.bucle = bucle
+        self.periodo = periodo
+        self.bytes_cuadro = resolucion[0] * resolucion[1] * 3
+        self.proc = None
+        self.siguiente = 0   # Índice del próximo fotograma que entrega ffmpeg
+        self.ultimo = None   # (índice, fotograma) leído más recientemente
+        self._lock = threading.Lock()
+
+    def _abrir(self, indice=0):
+        self._cerrar_proceso()
+        inicio = indice / self.fps
+        cmd = [get_setting("FFMPEG_BINARY"), '-loglevel', 'error']
+        if self.bucle:
+            cmd += ['-stream_loop', '-1']
+        # En bucle, el instante pedido cae en alguna vuelta: buscar dentro de la primera
+        busqueda = inicio % self.periodo if self.bucle and self.periodo else inicio
+        if busqueda > 0:
+            cmd += ['-ss', f"{busqueda:.3f}"]
+        cmd += [
+            '-i', self.ruta,
+            '-t', f"{self.duracion - inicio:.3f}",
+            '-vf', filtro_vertical(self.resolucion, self.fps),
+            '-an', '-sn',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'
+        ]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     bufsize=self.bytes_cuadro)
+        self.siguiente = indice
+
+    def _leer(self):
+        datos = self.proc.stdout.read(self.bytes_cuadro)
+        if len(datos) < self.bytes_cuadro:
+            return None
+        ancho, alto = self.resolucion
+        return np.frombuffer(datos, dtype=np.uint8).reshape(alto, ancho, 3)
+
+    def cuadro(self, indice):
+        """Fotograma número indice (el último disponible si el origen se acaba antes)"""
+        with self._lock:
+            if self.ultimo is not None and self.ultimo[0] == indice:
+                return self.ultimo[1]
+
+            if self.proc is None or indice < self.siguiente:
+                self._abrir(indice)
+
+            fotograma = None
+            while self.siguiente <= indice:
+                fotograma = self._leer()
+                if fotograma is None:
+                    break
+                self.siguiente += 1
+
+            if fotograma is None:
+                # Redondeos de duración: repetir el último fotograma leído
+                if self.ultimo is None:
+                    raise IOError(f"ffmpeg no devolvió fotogramas de {self.ruta}")
+                return self.ultimo[1]
+
+            self.ultimo = (indice, fotograma)
+            return fotograma
+
+    def transcodificar(self, destino):
+        """
+        Escribe el origen ya recortado, escalado y a los FPS de salida en un video intermedio
+
+        Raises:
+            IOError: ffmpeg falló o no produjo el archivo
+        """
+        cmd = [
+            get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+            '-i', self.ruta,
+            '-t', f"{self.duracion:.3f}",
+            '-vf', filtro_vertical(self.resolucion, self.fps),
+            '-an', '-sn', *PARAMETROS_INTERMEDIO, destino
+        ]
+        resultado = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if resultado.returncode != 0 or not os.path.getsize(destino):
+            mensaje = resultado.stderr.decode('utf-8', 'replace').strip()
+            raise IOError(f"ffmpeg no pudo transcodificar {self.ruta}: {mensaje}")
+        return destino
+
+    def _cerrar_proceso(self):
+        if self.proc is not None:
+            self.proc.terminate()
+            self.proc.stdout.close()
+            self.proc.wait()
+            self.proc = None
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrar_proceso()
+            self.ultimo = None
+
+    def __del__(self):
+        try:
+            self._cerrar_proceso()
+        except Exception:
+            pass
+
+
+class ClipVertical(VideoClip):
+    """
+    Clip de MoviePy con un video de stock ya ajustado a la resolución vertical
+
+    Equivale a recortar al centro a 9:16, redimensionar y cortar (o repetir
+    en bucle) a la duración pedida, pero el recorte y el escalado ocurren
+    dentro de ffmpeg. Si el origen dura menos que el segmento, se procesa una
+    sola vez a un intermedio a la resolución de salida y cada vuelta del
+    bucle solo decodifica ese intermedio, no el original HD/4K.
+    """
+
+    def __init__(self, ruta, resolucion, duracion, fps=30, directorio=None):
+        """
+        Args:
+            ruta (str): Video de origen (cualquier resolución y orientación)
+            resolucion (tuple): (ancho, alto) de salida
+            duracion (float): Duración del clip resultante
+            fps (int): FPS de salida (los del video final)
+            directorio (str): Carpeta del intermedio de los bucles (default: temporal del sistema)
+        """
+        self.ruta = ruta
+        self.fps = fps
+        self.ruta_bucle = None
+
+        duracion_origen = ffmpeg_parse_infos(ruta).get('duration') or 0
+
+        if duracion_origen >= duracion:
+            self.lector = LectorVertical(ruta, resolucion, fps, duracion)
+        else:
+            # Bucle: recortar, escalar y remuestrear el origen una sola vez
+            fd, self.ruta_bucle = tempfile.mkstemp(suffix=".mp4", dir=directorio)
+            os.close(fd)
+            try:
+                LectorVertical(ruta, resolucion, fps, duracion_origen).transcodificar(self.ruta_bucle)
+                origen = self.ruta_bucle
+            except IOError as e:
+                print(f"⚠️ {e}; el bucle se decodifica desde el original")
+                self._borrar_intermedio()
+                origen = ruta
+            self.lector = LectorVertical(origen, resolucion, fps, duracion, bucle=True,
+                                         periodo=duracion_origen)
+
+        VideoClip.__init__(self, make_frame=self._cuadro, duration=duracion)
+
+    def _cuadro(self, t):
+        return self.lector.cuadro(int(t * self.fps + 1e-6))
+
+    def _borrar_intermedio(self):
+        if self.ruta_bucle is not None:
+            try:
+                os.remove(self.ruta_bucle)
+            except OSError:
+                pass
+            self.ruta_bucle = None
+
+    def close(self):
+        self.lector.cerrar()
+        self._borrar_intermedio()
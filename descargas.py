@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capa de descargas HTTP compartida
+Una sola sesión keep-alive con pool de conexiones, reintentos y límite de
+descargas simultáneas por host, más un pool de hilos para bajar varios
+recursos en paralelo. Los archivos grandes se descargan por trozos
+directamente a disco, reanudando con cabeceras Range si se corta la conexión
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ClienteDescargas:
+    """
+    Descarga recursos en paralelo reutilizando conexiones TLS
+
+    Todas las peticiones pasan por la misma requests.Session, así que las
+    descargas sucesivas a images.pexels.com / videos.pexels.com reutilizan
+    la conexión en lugar de abrir una nueva cada vez.
+    """
+
+    MAX_HILOS = 8
+    MAX_POR_HOST = 4
+    REINTENTOS = 3
+    TAMANIO_TROZO = 1024 * 1024  # 1 MB por escritura: la memoria no crece con el archivo
+
+    def __init__(self, max_hilos=None, max_por_host=None, reintentos=None):
+        """
+        Args:
+            max_hilos (int): Descargas simultáneas en total
+            max_por_host (int): Descargas simultáneas contra un mismo host
+            reintentos (int): Reintentos ante errores de red o 429/5xx
+        """
+        self.max_hilos = max_hilos or self.MAX_HILOS
+        self.max_por_host = max_por_host or self.MAX_POR_HOST
+
+        retry = Retry(
+            total=reintentos if reintentos is not None else self.REINTENTOS,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_hilos,
+            pool_maxsize=self.max_hilos,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._semaforos = {}
+        self._lock = threading.Lock()
+        # Callback opcional (host, bytes) para contabilizar tráfico (ver instrumentacion.py)
+        self.al_transferir = None
+        self._pool = ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="descarga")
+
+    def _semaforo(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._semaforos[host]
+
+    def get(self, url, timeout=10, **kwargs):
+        """GET sobre la sesión compartida respetando el límite por host"""
+        with self._semaforo(url):
+            response = self.session.get(url, timeout=timeout, **kwargs)
+        if not kwargs.get('stream'):
+            self._contar(url, len(response.content))
+        return response
+
+    def _contar(self, url, cantidad):
+        if self.al_transferir is not None:
+            self.al_transferir(urlparse(url).netloc, cantidad)
+
+    def descargar_bytes(self, url, timeout=10):
+        """Descarga un recurso completo en memoria (None si falla)"""
+        response = self.get(url, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        return response.content
+
+    def descargar_a_archivo(self, url, destino, max_bytes=None, timeout=30):
+        """
+        Descarga un recurso por trozos directamente a disco
+
+        Escribe en <destino>.part y lo renombra al terminar. Si la conexión se
+        corta, reanuda desde el último byte recibido con una cabecera Range.
+
+        Args:
+            url (str): URL del recurso
+            destino (str): Ruta final del archivo
+            max_bytes (int): Tamaño máximo permitido (None = sin límite)
+            timeout (int): Timeout de conexión/lectura en segundos
+
+        Returns:
+            str: Ruta del archivo descargado o None si falla o supera max_bytes
+        """
+        parcial = destino + ".part"
+        if os.path.exists(parcial):
+            os.remove(parcial)
+
+        for _ in range(self.REINTENTOS + 1):
+            recibidos = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+            headers = {"Range": f"bytes={recibidos}-"} if recibidos else {}
+
+            try:
+                with self._semaforo(url):
+                    with self.session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                        if response.status_code == 416 and recibidos:
+                            # El servidor indica que ya tenemos el archivo completo
+                            break
+                        if response.status_code == 200:
+                            # El servidor ignoró el Range: empezar desde cero
+                            recibidos = 0
+                        elif response.status_code != 206:
+                            return None
+
+                        total = response.headers.get("Content-Length")
+                        if max_bytes and total and recibidos + int(total) > max_bytes:
+                            print(f"   ⚠️ Descarga descartada: supera {max_bytes // (1024 * 1024)} MB")
+                            self._borrar(parcial)
+                            return None
+
+                        with open(parcial, 'ab' if recibidos else 'wb') as f:
+                            for trozo in response.iter_content(chunk_size=self.TAMANIO_TROZO):
+                                recibidos += len(trozo)
+                                if max_bytes and recibidos > max_bytes:
+                                    print(f"   ⚠️ Descarga cortada: supera {max_bytes // (1024 * 1024)} MB")
+                                    f.close()
+                                    self._borrar(parcial)
+                                    return None
+                                f.write(trozo)
+                                self._contar(url, len(trozo))
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+                # Reintentar reanudando desde lo ya escrito
+                continue
+        else:
+            self._borrar(parcial)
+            return None
+
+        os.replace(parcial, destino)
+        return destino
+
+    @staticmethod
+    def _borrar(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def mapear(self, funcion, elementos):
+        """
+        Ejecuta funcion(elemento) en paralelo y devuelve los resultados en orden
+
+        Un elemento que lanza excepción produce None en su posición.
+        """
+        futuros = [self._pool.submit(funcion, e) for e in elementos]
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception:
+                resultados.append(None)
+        return resultados
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
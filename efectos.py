@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor Ken Burns (zoom y paneo) para segmentos de imagen fija
+La imagen se escala una sola vez al zoom máximo del efecto y cada fotograma
+es una ventana de esa imagen: en los paneos un recorte NumPy sin copia y en
+los zooms un único resize bilineal de la ventana, en vez de redimensionar el
+fotograma completo con PIL en cada instante
+"""
+
+import math
+
+import numpy as np
+from PIL import Image
+
+
+ZOOM_MAX = 1.3     # zoom_in / zoom_out van de 1.0 a 1.3 (igual que el efecto anterior)
+ZOOM_PANEO = 1.15  # Margen que recorren pan_left / pan_right
+
+EFECTOS_KEN_BURNS = ('zoom_in', 'zoom_out', 'pan_left', 'pan_right')
+
+
+class KenBurns:
+    """
+    Fotogramas de un efecto Ken Burns sobre una imagen fija
+
+    Ejemplo:
+        kb = KenBurns(imagen, (1080, 1920), 'zoom_in', duracion=5)
+        clip = VideoClip(kb.cuadro, duration=5)
+
+    El zoom es centrado. pan_left recorre la imagen de derecha a izquierda y
+    pan_right de izquierda a derecha, con el zoom fijo de ZOOM_PANEO.
+    """
+
+    def __init__(self, imagen, resolucion, efecto, duracion, zoom_max=ZOOM_MAX, zoom_paneo=ZOOM_PANEO):
+        """
+        Args:
+            imagen: PIL.Image o array (h, w, 3) de cualquier tamaño
+            resolucion (tuple): (ancho, alto) de los fotogramas
+            efecto (str): Uno de EFECTOS_KEN_BURNS
+            duracion (float): Duración del efecto en segundos
+            zoom_max (float): Zoom final de zoom_in (e inicial de zoom_out)
+            zoom_paneo (float): Zoom fijo de los paneos
+        """
+        if efecto not in EFECTOS_KEN_BURNS:
+            raise ValueError(f"Efecto Ken Burns desconocido: {efecto}")
+
+        self.resolucion = resolucion
+        self.efecto = efecto
+        self.duracion = duracion
+        self.paneo = efecto.startswith('pan')
+        self.zoom = zoom_paneo if self.paneo else zoom_max
+
+        if not isinstance(imagen, Image.Image):
+            imagen = Image.fromarray(np.asarray(imagen).astype(np.uint8))
+        imagen = imagen.convert('RGB')
+
+        # Escala única: la imagen cubre el fotograma con el zoom máximo, así la
+        # ventana más pequeña (zoom máximo) se copia 1:1 sin remuestrear
+        ancho, alto = resolucion
+        escala = max(ancho / imagen.width, alto / imagen.height) * self.zoom
+        tamanio = (
+            max(math.ceil(ancho * self.zoom), round(imagen.width * escala)),
+            max(math.ceil(alto * self.zoom), round(imagen.height * escala))
+        )
+        self.base = imagen.resize(tamanio, Image.LANCZOS)
+        self.pixeles = np.asarray(self.base)
+
+    def _progreso(self, t):
+        if self.duracion <= 0:
+            return 1.0
+        return min(1.0, max(0.0, t / self.duracion))
+
+    def ventana(self, t):
+        """Caja (x0, y0, x1, y1) de la imagen base que se ve en el instante t"""
+        p = self._progreso(t)
+        ancho_base, alto_base = self.base.size
+        ancho, alto = self.resolucion
+
+        if self.paneo:
+            recorrido = ancho_base - ancho
+            x0 = round(recorrido * (1.0 - p if self.efecto == 'pan_left' else p))
+            y0 = (alto_base - alto) // 2
+            return x0, y0, x0 + ancho, y0 + alto
+
+        z = 1.0 + (self.zoom - 1.0) * (p if self.efecto == 'zoom_in' else 1.0 - p)
+        w = ancho * self.zoom / z
+        h = alto * self.zoom / z
+        x0 = (ancho_base - w) / 2
+        y0 = (alto_base - h) / 2
+        return x0, y0, x0 + w, y0 + h
+
+    def cuadro(self, t):
+        """Fotograma (alto, ancho, 3) uint8 del instante t"""
+        x0, y0, x1, y1 = self.ventana(t)
+
+        if self.paneo:
+            # Ventana del tamaño exacto del fotograma: vista sin copia ni remuestreo
+            return self.pixeles[y0:y1, x0:x1]
+
+        # Un solo resize de la ventana (con coordenadas subpíxel, sin saltos)
+        return np.asarray(self.base.resize(self.resolucion, Image.BILINEAR, box=(x0, y0, x1, y1)))
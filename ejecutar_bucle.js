@@ -1,47 +1,194 @@
-const { exec } = require('child_process');
+const { spawn } = require('child_process');
+const net = require('net');
 
-// Función para ejecutar un archivo
-function ejecutar(comando, nombre) {
+const PUERTO_SERVICIO = parseInt(process.env.VIDEOLYZER_PUERTO || '8765', 10);
+const PYTHON = process.env.PYTHON || 'python';
+// Búfer de frases: Groq se llama en segundo plano y cada video saca un conjunto ya listo
+const USAR_BUFER = process.env.VIDEOLYZER_SIN_BUFER !== '1';
+
+// Función para ejecutar un archivo (la salida se ve en vivo, sin acumularla en memoria)
+function ejecutar(comando, args, nombre) {
     return new Promise((resolve) => {
         console.log(`\n▶ Ejecutando: ${nombre}`);
-        
-        exec(comando, (error, stdout, stderr) => {
-            if (error) {
-                console.log(`✗ Error en ${nombre}: ${error.message}`);
-                resolve(false);
-            } else {
+
+        const proceso = spawn(comando, args, { stdio: 'inherit' });
+        proceso.on('error', (error) => {
+            console.log(`✗ Error en ${nombre}: ${error.message}`);
+            resolve(false);
+        });
+        proceso.on('exit', (codigo) => {
+            if (codigo === 0) {
                 console.log(`✓ ${nombre} completado`);
-                if (stdout) console.log(stdout);
                 resolve(true);
+            } else {
+                console.log(`✗ Error en ${nombre}: código de salida ${codigo}`);
+                resolve(false);
+            }
+        });
+    });
+}
+
+// ========== SERVICIO PYTHON PERSISTENTE ==========
+// Un solo proceso Python con MoviePy, los generadores y Cloudinary ya cargados.
+// Cada ciclo le manda trabajos por un socket local y espera el evento de fin.
+
+let servicio = null;
+let conexion = null;
+const pendientes = new Map();
+let siguienteId = 1;
+let buferActivo = false;
+
+function esperar(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+function conectar() {
+    return new Promise((resolve, reject) => {
+        const socket = net.createConnection({ host: '127.0.0.1', port: PUERTO_SERVICIO });
+        let buffer = '';
+
+        socket.setEncoding('utf8');
+        socket.once('connect', () => resolve(socket));
+        socket.on('error', reject);
+        socket.on('data', (datos) => {
+            buffer += datos;
+            let salto;
+            while ((salto = buffer.indexOf('\n')) >= 0) {
+                const linea = buffer.slice(0, salto).trim();
+                buffer = buffer.slice(salto + 1);
+                if (!linea) continue;
+
+                const evento = JSON.parse(linea);
+                const trabajo = pendientes.get(evento.id);
+                if (trabajo && evento.evento === 'fin') {
+                    pendientes.delete(evento.id);
+                    trabajo.resolve(evento);
+                }
+            }
+        });
+        socket.on('close', () => {
+            conexion = null;
+            // Los trabajos en curso no van a terminar: darlos por fallidos
+            for (const trabajo of pendientes.values()) {
+                trabajo.resolve({ ok: false, error: 'Conexión con el servicio cerrada' });
+            }
+            pendientes.clear();
+        });
+    });
+}
+
+async function iniciarServicio() {
+    if (servicio && conexion) return true;
+
+    if (!servicio) {
+        console.log(`\n🚀 Iniciando servicio Python en el puerto ${PUERTO_SERVICIO}...`);
+        const argsServicio = ['-u', 'servicio_videos.py', '--puerto', String(PUERTO_SERVICIO)];
+        if (USAR_BUFER) argsServicio.push('--bufer');
+        servicio = spawn(PYTHON, argsServicio, { stdio: 'inherit' });
+        servicio.on('error', (error) => {
+            console.log(`✗ No se pudo iniciar el servicio: ${error.message}`);
+            servicio = null;
+        });
+        servicio.on('exit', (codigo) => {
+            console.log(`⚠️ El servicio terminó (código ${codigo})`);
+            servicio = null;
+        });
+    }
+
+    // El servicio carga MoviePy y los generadores antes de escuchar
+    for (let intento = 0; intento < 120 && servicio; intento++) {
+        try {
+            conexion = await conectar();
+            // El servicio dice si repone el búfer (sin API key de Groq no puede)
+            const ping = await enviarTrabajo({ tipo: 'ping' }, 'ping al servicio');
+            buferActivo = Boolean(ping.ok && ping.resultado && ping.resultado.bufer);
+            return true;
+        } catch (error) {
+            await esperar(1000);
+        }
+    }
+
+    console.log('✗ El servicio no responde');
+    if (servicio) servicio.kill();
+    servicio = null;
+    return false;
+}
+
+function enviarTrabajo(trabajo, nombre) {
+    return new Promise((resolve) => {
+        console.log(`\n▶ Trabajo: ${nombre}`);
+        const id = siguienteId++;
+
+        pendientes.set(id, {
+            resolve: (evento) => {
+                if (evento.ok) {
+                    console.log(`✓ ${nombre} completado en ${evento.segundos}s`);
+                } else {
+                    console.log(`✗ Error en ${nombre}: ${evento.error}`);
+                }
+                resolve(evento);
             }
         });
+        conexion.write(JSON.stringify({ id, ...trabajo }) + '\n');
     });
 }
 
-// Ejecutar los 3 archivos en secuencia INFINITAMENTE
+async function cicloConServicio() {
+    if (!await iniciarServicio()) return false;
+
+    // Con búfer el video saca frases ya generadas; sin él, igual que antes:
+    // si Groq falla, el video se hace con las frases anteriores
+    if (!buferActivo) {
+        await enviarTrabajo({ tipo: 'frases', num_frases: 3 }, 'generador_mindfulness');
+        if (!conexion) return false;
+    }
+    await enviarTrabajo({ tipo: 'video' }, 'videolyzer');
+    return conexion !== null;
+}
+
+async function cicloLegacy() {
+    // Con búfer solo se llama a Groq cuando quedan pocos conjuntos
+    const argsFrases = USAR_BUFER ? ['generador_mindfulness.py', '--reponer'] : ['generador_mindfulness.py'];
+    await ejecutar(PYTHON, argsFrases, 'generador_mindfulness.py');
+    const argsVideo = USAR_BUFER ? ['videolyzer.py', '--almacen'] : ['videolyzer.py'];
+    await ejecutar(PYTHON, argsVideo, 'videolyzer.py');
+}
+
+// Ejecutar los 3 pasos en secuencia INFINITAMENTE
 async function ejecutarBucleInfinito() {
     let iteracion = 1;
-    
+    const usarServicio = process.env.VIDEOLYZER_SIN_SERVICIO !== '1';
+
     while (true) {
         console.log(`\n${'='.repeat(70)}`);
         console.log(`🔄 ITERACIÓN #${iteracion} - ${new Date().toLocaleString()}`);
         console.log('='.repeat(70));
-        
-        await ejecutar('python generador_mindfulness.py', 'generador_mindfulness.py');
-        await ejecutar('python videolyzer.py', 'videolyzer.py');
-        await ejecutar('node instagram.js', 'instagram.js');
-        
+
+        // Si el servicio no arranca o se cae, este ciclo usa un proceso por script
+        if (!usarServicio || !await cicloConServicio()) {
+            await cicloLegacy();
+        }
+        await ejecutar('node', ['instagram.js'], 'instagram.js');
+
         console.log(`\n✅ Ciclo ${iteracion} completado`);
         console.log('⏳ Esperando 5 minutos para el próximo ciclo...\n');
-        
+
         // Esperar 5 minutos (300000 ms)
-        await new Promise(resolve => setTimeout(resolve, 300000));
-        
+        await esperar(300000);
+
         iteracion++;
     }
 }
 
+function detenerServicio() {
+    if (servicio) servicio.kill();
+    process.exit(0);
+}
+
+process.on('SIGINT', detenerServicio);
+process.on('SIGTERM', detenerServicio);
+
 console.log('🚀 INICIANDO BOT DE INSTAGRAM 24/7');
 console.log('Presiona Ctrl+C para detener\n');
 
-ejecutarBucleInfinito();
\ No newline at end of file
+ejecutarBucleInfinito();
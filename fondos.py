@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fondos procedurales para los segmentos sin foto ni video
+Degradado + campo de ruido suave + manchas difuminadas, todo con NumPy a baja
+resolución y escalado una sola vez al tamaño del video. La paleta y la
+semilla salen del tema, así que el mismo tema da siempre el mismo fondo, sin
+red y en pocos milisegundos. Los fondos también se pueden animar
+"""
+
+import colorsys
+import hashlib
+
+import numpy as np
+from PIL import Image
+
+
+def semilla_de(*partes):
+    """Semilla estable (no depende de PYTHONHASHSEED) a partir de textos o números"""
+    texto = "|".join(str(p) for p in partes)
+    return int.from_bytes(hashlib.sha256(texto.encode('utf-8')).digest()[:8], 'big')
+
+
+def _rgb(tono, luz, saturacion):
+    return tuple(int(round(c * 255)) for c in colorsys.hls_to_rgb(tono % 1.0, luz, saturacion))
+
+
+def paleta_desde_tema(tema):
+    """
+    Paleta de 3 colores derivada del tema: [base oscura, acento, claro]
+
+    Misma estructura que la paleta fija anterior (violeta oscuro, dorado,
+    crema): el acento y el claro van en el lado opuesto del círculo cromático.
+    """
+    bytes_tema = hashlib.sha256(tema.encode('utf-8')).digest()
+    tono = bytes_tema[0] / 255
+    giro = 0.43 + bytes_tema[1] / 255 * 0.14
+
+    return [
+        _rgb(tono, 0.22 + bytes_tema[2] / 255 * 0.10, 0.35 + bytes_tema[3] / 255 * 0.15),
+        _rgb(tono + giro, 0.49, 0.75),
+        _rgb(tono + giro + 0.02, 0.93, 0.90)
+    ]
+
+
+class FondoProcedural:
+    """
+    Fondo abstracto determinista para una paleta y una semilla
+
+    Ejemplo:
+        fondo = FondoProcedural((1080, 1920), paleta, semilla_de(tema, 0))
+        img = fondo.imagen()                              # PIL.Image fija
+        clip = VideoClip(fondo.cuadro, duration=5)        # fondo animado
+    """
+
+    ESCALA = 8          # Se calcula a 1/8 de resolución: todo el fondo es de baja frecuencia
+    NUM_MANCHAS = 7
+    PERIODO = 12.0      # Segundos de un ciclo completo de la animación
+
+    def __init__(self, resolucion, paleta, semilla, num_manchas=None):
+        """
+        Args:
+            resolucion (tuple): (ancho, alto) del video
+            paleta (list): Colores RGB [base, acento, claro] (ver paleta_desde_tema)
+            semilla (int): Semilla del ruido y de las manchas
+            num_manchas (int): Número de manchas difuminadas
+        """
+        self.resolucion = resolucion
+        self.paleta = np.array(paleta[:3], dtype=np.float32)
+        rng = np.random.default_rng(semilla)
+
+        ancho, alto = resolucion
+        self.ancho_bajo = max(2, -(-ancho // self.ESCALA))
+        self.alto_bajo = max(2, -(-alto // self.ESCALA))
+        y, x = np.mgrid[0:self.alto_bajo, 0:self.ancho_bajo].astype(np.float32)
+        self._x = x / self.ancho_bajo
+        self._y = y / self.alto_bajo
+
+        # Degradado vertical de la base a una versión más oscura, con leve inclinación
+        base, oscuro = self.paleta[0], self.paleta[0] * 0.45
+        mezcla = np.clip(self._y * 0.85 + self._x * 0.15, 0.0, 1.0)[:, :, None]
+        fondo = base * (1.0 - mezcla) + oscuro * mezcla
+
+        # Campo de ruido suave: rejilla aleatoria gruesa interpolada (value noise)
+        rejilla = rng.random((6, 4), dtype=np.float32)
+        ruido = Image.fromarray(rejilla).resize((self.ancho_bajo, self.alto_bajo), Image.BICUBIC)
+        self._fondo = fondo * (0.85 + 0.3 * np.asarray(ruido)[:, :, None])
+
+        # Manchas: centro, radio, color (acento o claro, en el caso de la base aclarada) y opacidad
+        n = num_manchas or self.NUM_MANCHAS
+        self._centros = rng.random((n, 2), dtype=np.float32)
+        self._radios = (0.05 + rng.random(n, dtype=np.float32) * 0.10)
+        colores = np.concatenate([self.paleta[1:], self.paleta[:1] * 1.6 + 20], axis=0)
+        self._colores = np.clip(colores[rng.integers(0, len(colores), n)], 0, 255)
+        self._opacidad = (0.30 + rng.random(n, dtype=np.float32) * 0.40)
+        self._fases = rng.random((n, 2), dtype=np.float32) * 2 * np.pi
+        self._amplitud = (0.03 + rng.random(n, dtype=np.float32) * 0.07)
+
+    def _baja(self, t=None):
+        """Fotograma a baja resolución (alto_bajo, ancho_bajo, 3) float32"""
+        centros = self._centros
+        if t is not None:
+            angulo = 2 * np.pi * t / self.PERIODO
+            centros = centros + self._amplitud[:, None] * np.sin(angulo + self._fases)
+
+        # Distancias de todas las manchas a la vez: (n, alto, ancho); el eje x se
+        # corrige por la proporción para que las manchas sean redondas
+        proporcion = self.resolucion[0] / self.resolucion[1]
+        dx = (self._x[None] - centros[:, 0, None, None]) * proporcion
+        dy = self._y[None] - centros[:, 1, None, None]
+        alfa = self._opacidad[:, None, None] * np.exp(
+            -(dx * dx + dy * dy) / (2 * self._radios[:, None, None] ** 2)
+        )
+
+        imagen = self._fondo
+        for a, color in zip(alfa, self._colores):
+            imagen = imagen * (1.0 - a[:, :, None]) + color * a[:, :, None]
+        return imagen
+
+    def _escalar(self, baja):
+        pequena = Image.fromarray(np.clip(baja + 0.5, 0, 255).astype(np.uint8))
+        # Bilineal basta: el contenido es de muy baja frecuencia
+        return pequena.resize(self.resolucion, Image.BILINEAR)
+
+    def imagen(self):
+        """Fondo fijo como PIL.Image del tamaño del video"""
+        return self._escalar(self._baja())
+
+    def cuadro(self, t):
+        """Fotograma (alto, ancho, 3) uint8 del fondo animado en el instante t"""
+        return np.asarray(self._escalar(self._baja(t)))
@@ -13,7 +13,8 @@ if sys.platform == 'win32':
 #!/usr/bin/env python3
 """
 Generador de Frases de Mindfulness con Groq API (100% GRATIS)
-Genera frases nuevas cada 5 minutos y las guarda en un JSON
+Genera frases nuevas cada 5 minutos y las guarda en un JSON (y en el corpus
+frases.db, que descarta las repetidas)
 
 API Key gratuita: https://console.groq.com/
 - 30 requests por minuto
@@ -22,13 +23,19 @@ API Key gratuita: https://console.groq.com/
 """
 
 import json
+import math
 import time
 import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
 load_dotenv()  # Cargar variables de .env
 
+from cliente_groq import ClienteGroq
+from limitador_tasa import LimitadorTasa
+
 
 class GeneradorMindfulness:
     """
@@ -103,7 +110,27 @@ class GeneradorMindfulness:
         "Namaste: honrar lo divino en todos"
     ]
     
-    def __init__(self, api_key=None, archivo_json="mindfulness.json", intervalo_minutos=5):
+    MODELO = "llama-3.3-70b-versatile"  # Modelo gratis más potente de Groq
+    MENSAJE_SISTEMA = "Eres un maestro espiritual experto en mindfulness, ayurveda, hinduismo y filosofía védica. Generas frases profundas e inspiradoras en español sobre temas específicos de espiritualidad."
+    
+    # Modo lote: temas por llamada (una sola respuesta JSON) y llamadas simultáneas
+    TEMAS_POR_LLAMADA = 6
+    CONCURRENCIA_LOTE = 2
+    TOKENS_POR_FRASE = 80  # Margen de max_tokens por frase pedida
+    
+    # Cupo de la cuenta gratuita (ver docstring del módulo) y reintentos ante 429/5xx
+    PETICIONES_POR_MINUTO = int(os.getenv("GROQ_RPM", "30"))
+    TOKENS_POR_MINUTO = int(os.getenv("GROQ_TPM", "6000"))
+    MAX_REINTENTOS = 4
+    
+    # Búfer de conjuntos listos (tema + 3 frases) en el almacén: por debajo de
+    # la marca baja se genera un lote hasta volver a la marca alta
+    BUFER_MINIMO = int(os.getenv("MINDFULNESS_BUFER_MINIMO", "6"))
+    BUFER_MAXIMO = int(os.getenv("MINDFULNESS_BUFER_MAXIMO", "36"))
+    INTERVALO_BUFER = 30  # Segundos entre comprobaciones del hilo de reposición
+    
+    def __init__(self, api_key=None, archivo_json="mindfulness.json", intervalo_minutos=5, almacen=None,
+                 stream=False):
         """
         Inicializa el generador
         
@@ -111,8 +138,18 @@ class GeneradorMindfulness:
             api_key (str): API key de Groq (gratis en console.groq.com)
             archivo_json (str): Nombre del archivo JSON a generar
             intervalo_minutos (int): Minutos entre cada generación
+            almacen (str): Corpus SQLite de frases (default: ver almacen_frases.py)
+            stream (bool): Recibir las respuestas de Groq en streaming (las frases se ven al llegar)
         """
         self.api_key = api_key or self.GROQ_API_KEY
+        self.ruta_almacen = almacen
+        self._almacen = None
+        # Compartido por todas las llamadas (y los hilos del modo lote)
+        self.limitador = LimitadorTasa(self.PETICIONES_POR_MINUTO, self.TOKENS_POR_MINUTO)
+        self.stream = stream
+        self._prompts = {}  # (tema, num_frases) -> prompt ya formateado
+        self._hilo_bufer = None
+        self._detener_bufer = threading.Event()
         
         # Ruta por defecto (compatible con Linux y Windows)
         ruta_base = os.path.dirname(os.path.abspath(__file__)) or "."
@@ -135,30 +172,27 @@ class GeneradorMindfulness:
             print("   3. Ve a 'API Keys' y crea una nueva")
             print("   4. Cópiala y pégala en el script o pásala como parámetro\n")
             raise ValueError("API key de Groq requerida")
-    
-    def generar_frases_groq(self, num_frases=10):
-        """
-        Genera frases de mindfulness usando Groq API basadas en un tema aleatorio
-        
-        Args:
-            num_frases (int): Número de frases a generar
-            
-        Returns:
-            tuple: (tema_elegido, lista_de_frases)
-        """
-        # Seleccionar tema aleatorio
-        import random
-        tema = random.choice(self.TEMAS)
-        
-        url = "https://api.groq.com/openai/v1/chat/completions"
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Prompt mejorado para generar frases basadas en el tema
-        prompt = f"""Genera exactamente {num_frases} frases únicas y profundas en español sobre el tema:
+        # Una sola sesión keep-alive para todas las llamadas (con una conexión por hilo del lote)
+        self.cliente = ClienteGroq(
+            self.api_key, self.MODELO, self.MENSAJE_SISTEMA, self.limitador,
+            max_reintentos=self.MAX_REINTENTOS,
+            conexiones=max(2, self.CONCURRENCIA_LOTE)
+        )
+    
+    def _completar_json(self, prompt, max_tokens):
+        """Llamada a Groq con respuesta JSON; en streaming muestra cada frase según llega"""
+        al_recibir = None
+        if self.stream:
+            al_recibir = lambda tema, frase: print(f"   ✨ {frase}")
+        return self.cliente.completar_json(prompt, max_tokens, stream=self.stream, al_recibir=al_recibir)
+    
+    def prompt_tema(self, tema, num_frases):
+        """Prompt de generación para un tema (se formatea una vez y se reutiliza)"""
+        clave = (tema, num_frases)
+        prompt = self._prompts.get(clave)
+        if prompt is None:
+            prompt = f"""Genera exactamente {num_frases} frases únicas y profundas en español sobre el tema:
 
 TEMA: {tema}
 
@@ -181,38 +215,34 @@ Responde SOLO con un JSON en este formato exacto:
 }}
 
 No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
-
-        payload = {
-            "model": "llama-3.3-70b-versatile",  # Modelo gratis más potente de Groq
-            "messages": [
-                {
-                    "role": "system",
-                    "content": f"Eres un maestro espiritual experto en mindfulness, ayurveda, hinduismo y filosofía védica. Generas frases profundas e inspiradoras en español sobre temas específicos de espiritualidad."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 1.3,  # Más creatividad para mayor variedad
-            "max_tokens": 1500,
-            "response_format": {"type": "json_object"}  # Forzar respuesta JSON
-        }
+            self._prompts[clave] = prompt
+        return prompt
+    
+    def precompilar_prompts(self, num_frases):
+        """Formatea y serializa de antemano las peticiones de todos los temas (modo continuo)"""
+        for tema in self.TEMAS:
+            self.cliente.cuerpo(self.prompt_tema(tema, num_frases), 1500, self.stream)
+    
+    def generar_frases_groq(self, num_frases=10, tema=None):
+        """
+        Genera frases de mindfulness usando Groq API basadas en un tema aleatorio
+        
+        Args:
+            num_frases (int): Número de frases a generar
+            tema (str): Tema concreto (default: uno aleatorio de TEMAS)
+            
+        Returns:
+            tuple: (tema_elegido, lista_de_frases)
+        """
+        # Seleccionar tema aleatorio
+        tema = tema or random.choice(self.TEMAS)
+        
+        prompt = self.prompt_tema(tema, num_frases)
         
         try:
             print(f"🎯 Tema seleccionado: '{tema}'")
             print(f"🤖 Llamando a Groq API (LLaMA 3.3 70B)...")
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            
-            if response.status_code != 200:
-                print(f"❌ Error {response.status_code}: {response.text}")
-                return None, None
-            
-            data = response.json()
-            contenido = data['choices'][0]['message']['content']
-            
-            # Parsear el JSON de respuesta
-            frases_data = json.loads(contenido)
+            frases_data = self._completar_json(prompt, max_tokens=1500)
             frases = frases_data.get('frases', [])
             
             print(f"✅ {len(frases)} frases generadas exitosamente sobre '{tema}'")
@@ -222,6 +252,103 @@ No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
             print(f"❌ Error generando frases: {e}")
             return None, None
     
+    def generar_frases_temas(self, temas, frases_por_tema=6):
+        """
+        Genera frases para varios temas en UNA sola llamada (una respuesta JSON)
+        
+        Args:
+            temas (list): Temas a cubrir
+            frases_por_tema (int): Frases por tema
+            
+        Returns:
+            dict: {tema: [frases]} con los temas que el modelo devolvió bien
+        """
+        lista_temas = "\n".join(f"- {tema}" for tema in temas)
+        prompt = f"""Genera exactamente {frases_por_tema} frases únicas y profundas en español para CADA uno de estos temas:
+
+{lista_temas}
+
+Las frases deben:
+- Estar completamente relacionadas con su tema
+- Ser inspiradoras, profundas y originales
+- Entre 12 y 25 palabras cada una
+- Ser completamente DIFERENTES entre sí (no repetir ideas)
+- Incluir conceptos específicos del tema
+- Ser calmantes y motivadoras
+- Usar vocabulario espiritual cuando sea apropiado
+
+Responde SOLO con un JSON en este formato exacto, con los temas escritos igual que arriba:
+{{
+  "temas": [
+    {{"tema": "tema 1", "frases": ["frase 1", "frase 2", ...]}},
+    ...
+  ]
+}}
+
+No incluyas explicaciones, solo el JSON con los {len(temas)} temas."""
+
+        max_tokens = len(temas) * frases_por_tema * self.TOKENS_POR_FRASE + 300
+        datos = self._completar_json(prompt, max_tokens=max_tokens)
+        
+        resultado = {}
+        for i, entrada in enumerate(datos.get('temas', [])):
+            if not isinstance(entrada, dict):
+                continue
+            tema = entrada.get('tema')
+            # Si el modelo reescribe el nombre del tema, usar el pedido en esa posición
+            if tema not in temas and i < len(temas):
+                tema = temas[i]
+            frases = [f for f in entrada.get('frases', []) if isinstance(f, str) and f.strip()]
+            if tema in temas and frases:
+                resultado[tema] = frases[:frases_por_tema]
+        return resultado
+    
+    def generar_lote(self, num_temas=None, frases_por_tema=6, concurrencia=None):
+        """
+        Genera frases para muchos temas con pocas llamadas
+        
+        Los temas se agrupan de TEMAS_POR_LLAMADA en TEMAS_POR_LLAMADA (una
+        respuesta JSON por grupo) y los grupos se piden con como mucho
+        `concurrencia` llamadas a la vez.
+        
+        Args:
+            num_temas (int): Temas distintos (default: todos los de TEMAS)
+            frases_por_tema (int): Frases por tema (múltiplo de 3 = conjuntos completos)
+            concurrencia (int): Llamadas simultáneas (default: CONCURRENCIA_LOTE)
+            
+        Returns:
+            dict: {tema: [frases]}
+        """
+        temas = random.sample(self.TEMAS, min(num_temas or len(self.TEMAS), len(self.TEMAS)))
+        grupos = [temas[i:i + self.TEMAS_POR_LLAMADA] for i in range(0, len(temas), self.TEMAS_POR_LLAMADA)]
+        concurrencia = max(1, min(concurrencia or self.CONCURRENCIA_LOTE, len(grupos)))
+        
+        print(f"🤖 Lote: {len(temas)} temas x {frases_por_tema} frases en {len(grupos)} llamadas "
+              f"({concurrencia} a la vez)")
+        
+        def pedir(grupo):
+            try:
+                return self.generar_frases_temas(grupo, frases_por_tema)
+            except Exception as e:
+                print(f"❌ Error generando lote ({', '.join(grupo)[:60]}...): {e}")
+                return {}
+        
+        resultado = {}
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            for parcial in pool.map(pedir, grupos):
+                resultado.update(parcial)
+        
+        total = sum(len(f) for f in resultado.values())
+        print(f"✅ {total} frases generadas para {len(resultado)}/{len(temas)} temas")
+        return resultado
+    
+    @property
+    def almacen(self):
+        if self._almacen is None:
+            from almacen_frases import AlmacenFrases
+            self._almacen = AlmacenFrases(self.ruta_almacen)
+        return self._almacen
+    
     def guardar_json(self, tema, frases):
         """
         Guarda el tema y las frases en un archivo JSON
@@ -251,6 +378,13 @@ No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
             
         except Exception as e:
             print(f"❌ Error guardando JSON: {e}")
+        
+        # El JSON se sobrescribe en cada ejecución: el historial queda en el corpus.
+        # Se guardan como usadas porque este conjunto lo consume el video que lee el JSON
+        try:
+            self.almacen.agregar_lote({tema: frases}, usadas=True)
+        except Exception as e:
+            print(f"⚠️ No se pudieron añadir las frases al corpus: {e}")
     
     def mostrar_frases(self, tema, frases):
         """
@@ -271,6 +405,33 @@ No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
         
         print("\n" + "="*70 + "\n")
     
+    def descartar_repetidas(self, tema, frases, num_frases):
+        """
+        Quita las frases que ya están en el corpus (o casi iguales); si no
+        quedan suficientes pide más sobre el mismo tema una vez
+        
+        Returns:
+            list: num_frases frases nuevas, o None si no se consiguen
+        """
+        try:
+            nuevas = self.almacen.filtrar_nuevas(frases)
+        except Exception as e:
+            print(f"⚠️ No se pudo consultar el corpus ({e}), se usan las frases tal cual")
+            return frases
+        
+        if len(nuevas) < len(frases):
+            print(f"♻️ {len(frases) - len(nuevas)} frases repetidas descartadas")
+        
+        if len(nuevas) < num_frases:
+            print(f"🔁 Pidiendo más frases sobre '{tema}'...")
+            _, extra = self.generar_frases_groq(num_frases * 2, tema=tema)
+            nuevas = self.almacen.filtrar_nuevas(nuevas + (extra or []))
+        
+        if len(nuevas) < num_frases:
+            print(f"⚠️ Solo {len(nuevas)} frases nuevas de {num_frases}")
+            return None
+        return nuevas[:num_frases]
+    
     def ejecutar_una_vez(self, num_frases=3, mostrar=True):
         """
         Ejecuta una sola generación de frases con tema aleatorio
@@ -285,6 +446,9 @@ No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
         
         tema, frases = self.generar_frases_groq(num_frases)
         
+        if frases and tema:
+            frases = self.descartar_repetidas(tema, frases, num_frases)
+        
         if frases and tema:
             if mostrar:
                 self.mostrar_frases(tema, frases)
@@ -294,6 +458,105 @@ No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
             print("⚠️ No se pudieron generar frases")
             return False
     
+    def ejecutar_lote(self, num_temas=None, frases_por_tema=6, concurrencia=None, mostrar=True):
+        """
+        Genera un lote de muchos temas y lo guarda en el almacén de frases
+        
+        Args:
+            num_temas (int): Temas distintos (default: todos)
+            frases_por_tema (int): Frases por tema
+            concurrencia (int): Llamadas simultáneas a Groq
+            mostrar (bool): Mostrar frases en consola
+        """
+        print(f"\n{'#'*70}")
+        print(f"# LOTE DE FRASES - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"{'#'*70}\n")
+        
+        frases_por_tema_generadas = self.generar_lote(num_temas, frases_por_tema, concurrencia)
+        if not frases_por_tema_generadas:
+            print("⚠️ No se pudieron generar frases")
+            return False
+        
+        if mostrar:
+            for tema, frases in frases_por_tema_generadas.items():
+                self.mostrar_frases(tema, frases)
+        
+        generadas = sum(len(f) for f in frases_por_tema_generadas.values())
+        guardadas = self.almacen.agregar_lote(frases_por_tema_generadas)
+        print(f"💾 {guardadas} frases guardadas en {os.path.abspath(self.almacen.ruta)}")
+        if guardadas < generadas:
+            print(f"♻️ {generadas - guardadas} frases repetidas descartadas")
+        print(f"📦 Conjuntos disponibles para videos: {self.almacen.conjuntos_disponibles()}")
+        return True
+    
+    def reponer_bufer(self, minimo=None, maximo=None, frases_por_tema=6):
+        """
+        Si quedan menos de `minimo` conjuntos sin usar, genera un lote hasta llegar a `maximo`
+        
+        Returns:
+            int: Conjuntos disponibles después de reponer
+        """
+        minimo = self.BUFER_MINIMO if minimo is None else minimo
+        maximo = max(minimo, self.BUFER_MAXIMO if maximo is None else maximo)
+        
+        disponibles = self.almacen.conjuntos_disponibles()
+        if disponibles >= minimo:
+            return disponibles
+        
+        # Cada tema aporta frases_por_tema // 3 conjuntos
+        conjuntos_por_tema = max(1, frases_por_tema // 3)
+        num_temas = min(len(self.TEMAS), math.ceil((maximo - disponibles) / conjuntos_por_tema))
+        print(f"📦 Búfer bajo ({disponibles} conjuntos, mínimo {minimo}): reponiendo hasta {maximo}")
+        self.ejecutar_lote(num_temas=num_temas, frases_por_tema=frases_por_tema, mostrar=False)
+        return self.almacen.conjuntos_disponibles()
+    
+    def mantener_bufer(self, minimo=None, maximo=None, intervalo=None):
+        """
+        Comprueba el búfer cada `intervalo` segundos y lo repone (hasta detener_bufer o Ctrl+C)
+        
+        Si Groq falla, sigue con el retroceso del limitador en vez de insistir
+        cada intervalo; el render no se entera mientras queden conjuntos.
+        """
+        minimo = self.BUFER_MINIMO if minimo is None else minimo
+        intervalo = intervalo or self.INTERVALO_BUFER
+        fallos_seguidos = 0
+        
+        while not self._detener_bufer.is_set():
+            try:
+                ok = self.reponer_bufer(minimo, maximo) >= minimo
+            except Exception as e:
+                print(f"❌ Error reponiendo el búfer de frases: {e}")
+                ok = False
+            
+            if ok:
+                fallos_seguidos = 0
+                espera = intervalo
+            else:
+                espera = max(intervalo, self.limitador.retroceso(self.MAX_REINTENTOS + fallos_seguidos))
+                fallos_seguidos += 1
+                print(f"⚠️ Búfer sin reponer ({fallos_seguidos} intentos), reintentando en {espera:.0f}s")
+            
+            self._detener_bufer.wait(max(espera, self.limitador.tiempo_hasta_disponible()))
+    
+    def iniciar_bufer(self, minimo=None, maximo=None, intervalo=None):
+        """Mantiene el búfer en un hilo en segundo plano (no hace nada si ya está en marcha)"""
+        if self._hilo_bufer and self._hilo_bufer.is_alive():
+            return self._hilo_bufer
+        
+        self._detener_bufer.clear()
+        self._hilo_bufer = threading.Thread(
+            target=self.mantener_bufer, args=(minimo, maximo, intervalo),
+            name="bufer-frases", daemon=True
+        )
+        self._hilo_bufer.start()
+        return self._hilo_bufer
+    
+    def detener_bufer(self):
+        self._detener_bufer.set()
+        if self._hilo_bufer:
+            self._hilo_bufer.join(timeout=5)
+            self._hilo_bufer = None
+    
     def ejecutar_continuamente(self, num_frases=3):
         """
         Ejecuta el generador cada X minutos indefinidamente con temas aleatorios
@@ -311,27 +574,38 @@ No incluyas explicaciones, solo el JSON con las {num_frases} frases."""
         print(f"{'='*70}\n")
         
         iteracion = 1
+        fallos_seguidos = 0
+        self.precompilar_prompts(num_frases)
         
         try:
             while True:
                 print(f"\n🔄 ITERACIÓN #{iteracion}")
                 
-                if self.ejecutar_una_vez(num_frases, mostrar=True):
-                    print(f"\n⏳ Esperando {self.intervalo_segundos // 60} minutos hasta la próxima generación...")
-                    print(f"   (Próxima ejecución: {datetime.fromtimestamp(time.time() + self.intervalo_segundos).strftime('%H:%M:%S')})")
+                exito = self.ejecutar_una_vez(num_frases, mostrar=True)
+                if exito:
+                    fallos_seguidos = 0
+                    espera = self.intervalo_segundos
                 else:
-                    print(f"\n⚠️ Error en la generación, reintentando en 1 minuto...")
-                    time.sleep(60)
-                    continue
+                    # Cada llamada ya reintentó MAX_REINTENTOS veces: seguir el retroceso desde ahí
+                    espera = min(self.intervalo_segundos,
+                                 self.limitador.retroceso(self.MAX_REINTENTOS + fallos_seguidos))
+                    fallos_seguidos += 1
+                    print(f"\n⚠️ Error en la generación ({fallos_seguidos} seguidos), reintentando en {espera:.0f}s...")
                 
-                # Esperar el intervalo
-                time.sleep(self.intervalo_segundos)
-                iteracion += 1
+                # No despertar antes de que haya cupo (p.ej. tras un retry-after largo)
+                espera = max(espera, self.limitador.tiempo_hasta_disponible())
+                print(f"\n⏳ Esperando {espera / 60:.1f} minutos hasta la próxima generación...")
+                print(f"   (Próxima ejecución: {datetime.fromtimestamp(time.time() + espera).strftime('%H:%M:%S')})")
+                time.sleep(espera)
+                if exito:
+                    iteracion += 1
                 
         except KeyboardInterrupt:
             print("\n\n✅ Generador detenido por el usuario")
             print(f"📊 Total de iteraciones: {iteracion}")
             print(f"📁 Último archivo: {os.path.abspath(self.archivo_json)}\n")
+        finally:
+            self.cliente.cerrar()
 
 
 def generar_frases_mindfulness(api_key=None, archivo="mindfulness.json", num_frases=3):
@@ -371,8 +645,23 @@ Ejemplos:
   # Modo continuo (cada 10 minutos)
   python %(prog)s --api-key tu_api_key_aqui --continuo -i 10
   
+  # Modo continuo viendo las frases a medida que las escribe el modelo
+  python %(prog)s --api-key tu_api_key_aqui --continuo --stream
+  
   # Archivo personalizado
   python %(prog)s --api-key tu_api_key_aqui -o frases.json
+  
+  # Lote: 6 frases de cada tema al almacén (frases.db) en pocas llamadas
+  python %(prog)s --api-key tu_api_key_aqui --lote
+  
+  # Lote de 12 temas con 9 frases cada uno (36 videos)
+  python %(prog)s --api-key tu_api_key_aqui --lote 12 --frases-por-tema 9
+  
+  # Mantener siempre entre 6 y 36 videos de frases listos (segundo plano del bot)
+  python %(prog)s --api-key tu_api_key_aqui --bufer --minimo 6 --maximo 36
+  
+  # Añadir el mindfulness.json actual al corpus (para no repetir sus frases)
+  python %(prog)s --api-key tu_api_key_aqui --importar mindfulness.json
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
@@ -383,6 +672,24 @@ Ejemplos:
     parser.add_argument('-i', '--intervalo', type=int, default=5, help='Minutos entre generaciones en modo continuo (default: 5)')
     parser.add_argument('--continuo', action='store_true', help='Ejecutar continuamente cada X minutos')
     parser.add_argument('--no-mostrar', action='store_true', help='No mostrar frases en consola')
+    parser.add_argument('--lote', type=int, nargs='?', const=0, default=None, metavar='TEMAS',
+                        help='Generar frases de muchos temas con pocas llamadas y guardarlas en el almacén (default: todos los temas)')
+    parser.add_argument('--frases-por-tema', type=int, default=6, help='Frases por tema en modo --lote (default: 6)')
+    parser.add_argument('--concurrencia', type=int, default=None,
+                        help=f'Llamadas simultáneas en modo --lote (default: {GeneradorMindfulness.CONCURRENCIA_LOTE})')
+    parser.add_argument('--almacen', default=None, help='Corpus SQLite de frases (default: frases.db)')
+    parser.add_argument('--bufer', action='store_true',
+                        help='Mantener el búfer de conjuntos listos entre --minimo y --maximo (continuo)')
+    parser.add_argument('--reponer', action='store_true',
+                        help='Reponer el búfer una vez si está por debajo de --minimo y salir')
+    parser.add_argument('--minimo', type=int, default=None,
+                        help=f'Marca baja del búfer en conjuntos (default: {GeneradorMindfulness.BUFER_MINIMO})')
+    parser.add_argument('--maximo', type=int, default=None,
+                        help=f'Marca alta del búfer en conjuntos (default: {GeneradorMindfulness.BUFER_MAXIMO})')
+    parser.add_argument('--importar', nargs='+', metavar='JSON',
+                        help='Añadir al corpus (como usadas) las frases de JSON existentes y salir')
+    parser.add_argument('--stream', action='store_true',
+                        help='Recibir las respuestas en streaming y mostrar cada frase al llegar')
     
     args = parser.parse_args()
     
@@ -390,10 +697,41 @@ Ejemplos:
         generador = GeneradorMindfulness(
             api_key=args.api_key,
             archivo_json=args.output,
-            intervalo_minutos=args.intervalo
+            intervalo_minutos=args.intervalo,
+            almacen=args.almacen,
+            stream=args.stream
         )
         
-        if args.continuo:
+        if args.importar:
+            for ruta in args.importar:
+                guardadas = generador.almacen.importar_json(ruta)
+                print(f"📥 {ruta}: {guardadas} frases nuevas")
+            print(f"📊 Corpus: {generador.almacen.estadisticas()}")
+            exit(0)
+        
+        if args.reponer:
+            disponibles = generador.reponer_bufer(args.minimo, args.maximo)
+            print(f"📦 Conjuntos disponibles: {disponibles}")
+            exit(0 if disponibles > 0 else 1)
+        
+        if args.bufer:
+            print(f"📦 Manteniendo el búfer de frases en {os.path.abspath(generador.almacen.ruta)} (Ctrl+C para detener)")
+            try:
+                generador.mantener_bufer(args.minimo, args.maximo)
+            except KeyboardInterrupt:
+                print("\n✅ Búfer detenido por el usuario")
+            exit(0)
+        
+        if args.lote is not None:
+            # Muchos temas de una vez al almacén
+            ok = generador.ejecutar_lote(
+                num_temas=args.lote or None,
+                frases_por_tema=args.frases_por_tema,
+                concurrencia=args.concurrencia,
+                mostrar=not args.no_mostrar
+            )
+            exit(0 if ok else 1)
+        elif args.continuo:
             # Modo continuo
             generador.ejecutar_continuamente(num_frases=args.num_frases)
         else:
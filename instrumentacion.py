@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentación del pipeline de video
+Mide tiempo real, tiempo de CPU, memoria residente (RSS) y bytes transferidos
+por etapa, y guarda un reporte JSON por ejecución. Opcionalmente perfila con
+cProfile o tracemalloc
+
+La RSS de cada etapa es la del proceso muestreada de /proc/self/statm mientras
+la etapa está activa (inicio, fin y pico), no el máximo histórico de
+ru_maxrss, que en un proceso de larga vida solo crece. Las etapas que se
+solapan comparten muestras. Los bytes de TTS son el tamaño de los MP3
+recibidos (sin cabeceras HTTP ni WebSocket); los audios de la caché cuentan 0
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+    TIENE_RESOURCE = True
+except ImportError:
+    # Windows no tiene el módulo resource
+    TIENE_RESOURCE = False
+
+
+def rss_pico_mb(hijos=False):
+    """Memoria residente máxima desde que arrancó el proceso (o de sus hijos) en MB"""
+    if not TIENE_RESOURCE:
+        return None
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN if hijos else resource.RUSAGE_SELF)
+    # Linux reporta KB, macOS bytes
+    divisor = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return round(uso.ru_maxrss / divisor, 1)
+
+
+try:
+    _BYTES_PAGINA = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _BYTES_PAGINA = None
+
+
+def rss_actual_mb():
+    """Memoria residente actual del proceso en MB (None fuera de Linux)"""
+    if _BYTES_PAGINA is None:
+        return None
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(paginas * _BYTES_PAGINA / 1048576, 1)
+
+
+class Instrumentacion:
+    """
+    Registro de métricas de una ejecución
+
+    Uso:
+        metricas = Instrumentacion("video")
+        with metricas.etapa("exportar"):
+            ...
+        metricas.sumar_bytes("pexels", 123456)
+        metricas.guardar()
+
+    El tiempo de CPU de cada etapa es el del hilo que la ejecuta
+    (time.thread_time); el trabajo delegado a otros pools o procesos se ve en
+    los totales de proceso e hijos del reporte.
+    """
+
+    DIRECTORIO_DEFAULT = os.getenv("VIDEOLYZER_METRICAS_DIR", "metricas")
+    INTERVALO_RSS = 0.1  # Segundos entre muestras de RSS mientras hay etapas activas
+
+    def __init__(self, nombre="video", perfilar=None, directorio=None):
+        """
+        Args:
+            nombre (str): Nombre de la ejecución (aparece en el reporte)
+            perfilar (str): None, 'cprofile' o 'tracemalloc'
+            directorio (str): Carpeta de los reportes (default: metricas/)
+        """
+        self.nombre = nombre
+        self.perfilar = perfilar
+        self.directorio = directorio or self.DIRECTORIO_DEFAULT
+        self.fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.etapas = []
+        self.bytes = {}
+        self.extra = {}
+        self._lock = threading.Lock()
+        self._perfil = None
+        self._picos_rss = {}  # Etapas activas: id -> [pico de RSS en MB]
+        self._muestreo = None
+        self._fin_muestreo = threading.Event()
+
+        self._inicio_wall = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+        self._iniciar_perfil()
+
+    def _iniciar_perfil(self):
+        if self.perfilar == 'cprofile':
+            import cProfile
+            # cProfile solo ve el hilo que lo activa (el de la exportación)
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        elif self.perfilar == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start(10)
+
+    def _muestrear_rss(self):
+        """Hilo que actualiza el pico de RSS de las etapas activas"""
+        while not self._fin_muestreo.wait(self.INTERVALO_RSS):
+            rss = rss_actual_mb()
+            if rss is None:
+                return
+            with self._lock:
+                for pico in self._picos_rss.values():
+                    pico[0] = max(pico[0], rss)
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide una etapa del pipeline"""
+        bytes_antes = self.total_bytes()
+        rss_inicio = rss_actual_mb()
+        pico = [rss_inicio or 0.0]
+        with self._lock:
+            self._picos_rss[id(pico)] = pico
+            if self._muestreo is None and rss_inicio is not None and not self._fin_muestreo.is_set():
+                self._muestreo = threading.Thread(target=self._muestrear_rss, name="muestreo_rss", daemon=True)
+                self._muestreo.start()
+
+        inicio_wall = time.perf_counter()
+        inicio_cpu = time.thread_time()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = repr(e)
+            raise
+        finally:
+            rss_fin = rss_actual_mb()
+            with self._lock:
+                del self._picos_rss[id(pico)]
+            registro = {
+                "etapa": nombre,
+                "inicio_s": round(inicio_wall - self._inicio_wall, 3),
+                "wall_s": round(time.perf_counter() - inicio_wall, 3),
+                "cpu_s": round(time.thread_time() - inicio_cpu, 3),
+                "rss_inicio_mb": rss_inicio,
+                "rss_fin_mb": rss_fin,
+                "rss_pico_mb": max(pico[0], rss_fin) if rss_fin is not None else None,
+                "rss_delta_mb": round(rss_fin - rss_inicio, 1) if rss_inicio is not None else None,
+                # Bytes de red mientras la etapa estaba activa (incluye etapas solapadas)
+                "bytes": self.total_bytes() - bytes_antes,
+                "hilo": threading.current_thread().name
+            }
+            if error:
+                registro["error"] = error
+            with self._lock:
+                self.etapas.append(registro)
+
+    def envolver(self, nombre, funcion):
+        """Devuelve funcion medida como la etapa 'nombre'"""
+        def medida(*args, **kwargs):
+            with self.etapa(nombre):
+                return funcion(*args, **kwargs)
+        return medida
+
+    def sumar_bytes(self, origen, cantidad):
+        """Acumula bytes transferidos por origen (pexels, tts, cloudinary...)"""
+        with self._lock:
+            self.bytes[origen] = self.bytes.get(origen, 0) + cantidad
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(self.bytes.values())
+
+    def reporte(self):
+        """Reporte de la ejecución como dict serializable"""
+        with self._lock:
+            etapas = sorted(self.etapas, key=lambda e: e["inicio_s"])
+            bytes_origen = dict(self.bytes)
+
+        return {
+            "nombre": self.nombre,
+            "fecha": self.fecha,
+            "wall_s": round(time.perf_counter() - self._inicio_wall, 3),
+            "cpu_proceso_s": round(time.process_time() - self._inicio_cpu, 3),
+            "rss_mb": rss_actual_mb(),
+            # Máximos históricos del proceso (y sus hijos), no de esta ejecución
+            "rss_pico_proceso_mb": rss_pico_mb(),
+            "rss_pico_hijos_mb": rss_pico_mb(hijos=True),
+            "bytes": bytes_origen,
+            "etapas": etapas,
+            **self.extra
+        }
+
+    def guardar(self, ruta=None):
+        """
+        Escribe el reporte JSON (y el perfil si está activo) y termina la medición
+
+        Returns:
+            str: Ruta del reporte
+        """
+        self._fin_muestreo.set()
+        ruta = ruta or os.path.join(self.directorio, f"{self.nombre}_{self.fecha}.json")
+        datos = self.reporte()
+
+        # Detener el perfil antes de cualquier E/S que pueda fallar: no debe
+        # quedar activo en un proceso de larga vida (servicio_videos.py)
+        perfil, self._perfil = self._perfil, None
+        if perfil is not None:
+            perfil.disable()
+        elif self.perfilar == 'tracemalloc':
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                datos["tracemalloc_top"] = [
+                    {"origen": str(stat.traceback[0]), "kb": round(stat.size / 1024, 1)}
+                    for stat in snapshot.statistics('lineno')[:15]
+                ]
+
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        if perfil is not None:
+            ruta_perfil = os.path.splitext(ruta)[0] + ".prof"
+            perfil.dump_stats(ruta_perfil)
+            datos["perfil_cprofile"] = ruta_perfil
+
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+        return ruta
+
+    def resumen(self):
+        """Tabla corta de etapas para la consola"""
+        datos = self.reporte()
+        lineas = [f"⏱️  {'Etapa':<22}{'wall s':>9}{'cpu s':>9}{'MB red':>9}{'Δ RSS':>9}"]
+        for e in datos["etapas"]:
+            delta = f"{e['rss_delta_mb']:>+9.1f}" if e.get('rss_delta_mb') is not None else f"{'-':>9}"
+            lineas.append(
+                f"   {e['etapa']:<22}{e['wall_s']:>9.2f}{e['cpu_s']:>9.2f}{e['bytes'] / 1048576:>9.2f}{delta}"
+            )
+        lineas.append(f"   {'TOTAL':<22}{datos['wall_s']:>9.2f}{datos['cpu_proceso_s']:>9.2f}"
+                      f"{sum(datos['bytes'].values()) / 1048576:>9.2f}")
+        return "\n".join(lineas)
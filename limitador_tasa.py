@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Limitador de tasa del lado del cliente para la API de Groq
+Dos cubetas de fichas (peticiones/minuto y tokens/minuto) que se rellenan de
+forma continua y se corrigen con las cabeceras x-ratelimit-* de cada
+respuesta. Ante un 429 se respeta retry-after y se reintenta con retroceso
+exponencial con jitter; la pausa se aplica a todos los hilos que comparten
+el limitador, no solo al que recibió el 429
+"""
+
+import random
+import re
+import threading
+import time
+
+
+def parsear_duracion(texto):
+    """
+    Segundos de una duración de Groq/OpenAI ('7.66s', '2m59.56s', '1h2m', '120ms') o de retry-after ('3')
+
+    Returns:
+        float: Segundos, o None si el texto no se entiende
+    """
+    if texto is None:
+        return None
+    texto = str(texto).strip()
+    try:
+        return float(texto)
+    except ValueError:
+        pass
+
+    partes = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', texto)
+    if not partes or ''.join(n + u for n, u in partes) != texto:
+        return None
+    factores = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+    return sum(float(n) * factores[u] for n, u in partes)
+
+
+class _Cubeta:
+    """Cubeta de fichas que se rellena a capacidad/periodo fichas por segundo"""
+
+    def __init__(self, capacidad, periodo=60.0):
+        self.capacidad = float(capacidad)
+        self.ritmo = self.capacidad / periodo
+        self.fichas = self.capacidad
+        self.instante = time.monotonic()
+
+    def rellenar(self, ahora):
+        self.fichas = min(self.capacidad, self.fichas + (ahora - self.instante) * self.ritmo)
+        self.instante = ahora
+
+    def espera(self, cantidad):
+        """Segundos hasta tener `cantidad` fichas (0 si ya las hay)"""
+        cantidad = min(cantidad, self.capacidad)
+        if self.fichas >= cantidad:
+            return 0.0
+        return (cantidad - self.fichas) / self.ritmo
+
+
+class LimitadorTasa:
+    """
+    Reparte el cupo por minuto entre las llamadas (y los hilos) de un proceso
+
+    Ejemplo:
+        limitador = LimitadorTasa(30, 6000)
+        limitador.esperar(tokens_estimados)
+        respuesta = sesion.post(...)
+        limitador.actualizar(respuesta.headers)
+        if respuesta.status_code == 429:
+            limitador.pausar(limitador.retroceso(intento, respuesta.headers.get('retry-after')))
+
+    Las cubetas arrancan llenas; la primera respuesta de la API las corrige
+    con lo que de verdad queda (p.ej. si otro proceso usó la misma clave).
+    """
+
+    def __init__(self, peticiones_por_minuto=30, tokens_por_minuto=6000, margen=0.95,
+                 retroceso_base=2.0, retroceso_max=120.0):
+        """
+        Args:
+            peticiones_por_minuto (int): Cupo de peticiones de la cuenta
+            tokens_por_minuto (int): Cupo de tokens (entrada + salida) de la cuenta
+            margen (float): Fracción del cupo que se usa (deja holgura para el redondeo del servidor)
+            retroceso_base (float): Primera espera de reintento en segundos
+            retroceso_max (float): Espera máxima de reintento en segundos
+        """
+        self.peticiones = _Cubeta(peticiones_por_minuto * margen)
+        self.tokens = _Cubeta(tokens_por_minuto * margen)
+        self.margen = margen
+        self.retroceso_base = retroceso_base
+        self.retroceso_max = retroceso_max
+        self.pausa_hasta = 0.0
+        self._condicion = threading.Condition()
+
+    def _espera(self, tokens, ahora):
+        self.peticiones.rellenar(ahora)
+        self.tokens.rellenar(ahora)
+        return max(
+            self.pausa_hasta - ahora,
+            self.peticiones.espera(1),
+            self.tokens.espera(tokens)
+        )
+
+    def tiempo_hasta_disponible(self, tokens=0):
+        """Segundos hasta poder lanzar una petición de `tokens` tokens"""
+        with self._condicion:
+            return max(0.0, self._espera(tokens, time.monotonic()))
+
+    def esperar(self, tokens):
+        """
+        Bloquea hasta que haya cupo para una petición y lo reserva
+
+        Una petición mayor que la cubeta de tokens espera a tenerla llena y la
+        deja en negativo: el cupo se recupera antes de la siguiente.
+
+        Returns:
+            float: Segundos esperados
+        """
+        inicio = time.monotonic()
+        with self._condicion:
+            while True:
+                ahora = time.monotonic()
+                espera = self._espera(tokens, ahora)
+                if espera <= 0:
+                    break
+                self._condicion.wait(espera)
+
+            self.peticiones.fichas -= 1
+            self.tokens.fichas -= tokens
+        return time.monotonic() - inicio
+
+    def ajustar_tokens(self, reservados, usados):
+        """Devuelve (o cobra) la diferencia entre los tokens reservados y los que informó la API"""
+        with self._condicion:
+            self.tokens.fichas = min(self.tokens.capacidad, self.tokens.fichas + reservados - usados)
+            self._condicion.notify_all()
+
+    def actualizar(self, cabeceras):
+        """
+        Corrige las cubetas con las cabeceras de rate limit de una respuesta
+
+        x-ratelimit-remaining-tokens / -requests: lo que queda según el servidor
+        x-ratelimit-reset-tokens / -requests: cuándo se repone el cupo agotado
+        retry-after: pausa obligatoria (429)
+        """
+        if not cabeceras:
+            return
+        ahora = time.monotonic()
+
+        with self._condicion:
+            for cubeta, sufijo in ((self.tokens, 'tokens'), (self.peticiones, 'requests')):
+                restantes = cabeceras.get(f'x-ratelimit-remaining-{sufijo}')
+                try:
+                    restantes = float(restantes) * self.margen
+                except (TypeError, ValueError):
+                    continue
+
+                cubeta.rellenar(ahora)
+                cubeta.fichas = min(cubeta.fichas, restantes)
+
+                # Cupo agotado en el servidor: no lanzar nada hasta que se reponga
+                reinicio = parsear_duracion(cabeceras.get(f'x-ratelimit-reset-{sufijo}'))
+                if restantes < 1 and reinicio:
+                    self.pausa_hasta = max(self.pausa_hasta, ahora + reinicio)
+
+            retry_after = parsear_duracion(cabeceras.get('retry-after'))
+            if retry_after:
+                self.pausa_hasta = max(self.pausa_hasta, ahora + retry_after)
+
+    def retroceso(self, intento, retry_after=None):
+        """
+        Espera antes del reintento número `intento` (0, 1, 2...)
+
+        Retroceso exponencial con jitter (al azar entre la mitad y el total
+        de base * 2^intento, con tope), nunca menor que retry-after.
+        """
+        tope = min(self.retroceso_max, self.retroceso_base * (2 ** intento))
+        espera = random.uniform(tope / 2, tope)
+        minimo = parsear_duracion(retry_after)
+        return max(espera, minimo or 0.0)
+
+    def pausar(self, segundos):
+        """Detiene todas las peticiones que usan este limitador durante `segundos`"""
+        with self._condicion:
+            self.pausa_hasta = max(self.pausa_hasta, time.monotonic() + segundos)
+            self._condicion.notify_all()
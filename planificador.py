@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificador de etapas con dependencias explícitas
+Cada etapa arranca en cuanto terminan las etapas de las que depende, así que
+las etapas independientes (descargas, TTS, texto) corren a la vez y el tiempo
+total es el de la cadena más larga
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class PlanificadorEtapas:
+    """
+    Grafo de etapas ejecutado sobre un pool de hilos
+
+    Ejemplo:
+        plan = PlanificadorEtapas()
+        plan.agregar('audio', generar_audio)
+        plan.agregar('visual', buscar_visual)
+        plan.agregar('segmento', construir, depende_de=('audio', 'visual'))
+        resultados = plan.ejecutar()
+
+    Cada función recibe como argumentos posicionales los resultados de sus
+    dependencias, en el orden de depende_de.
+    """
+
+    def __init__(self, max_hilos=8, instrumentacion=None):
+        """
+        Args:
+            max_hilos (int): Etapas simultáneas como máximo
+            instrumentacion (Instrumentacion): Si se pasa, cada etapa se mide
+        """
+        self.max_hilos = max_hilos
+        self.instrumentacion = instrumentacion
+        self.etapas = {}
+
+    def agregar(self, nombre, funcion, depende_de=()):
+        """Registra una etapa (las dependencias deben existir al ejecutar)"""
+        if nombre in self.etapas:
+            raise ValueError(f"Etapa duplicada: {nombre}")
+        self.etapas[nombre] = (funcion, tuple(depende_de))
+        return nombre
+
+    def _validar(self):
+        for nombre, (_, deps) in self.etapas.items():
+            for dep in deps:
+                if dep not in self.etapas:
+                    raise ValueError(f"La etapa '{nombre}' depende de '{dep}', que no existe")
+
+        # Detectar ciclos con un recorrido topológico
+        pendientes = {n: set(d) for n, (_, d) in self.etapas.items()}
+        listas = [n for n, d in pendientes.items() if not d]
+        vistas = 0
+        while listas:
+            actual = listas.pop()
+            vistas += 1
+            for n, d in pendientes.items():
+                if actual in d:
+                    d.discard(actual)
+                    if not d:
+                        listas.append(n)
+        if vistas != len(self.etapas):
+            raise ValueError("Las etapas tienen dependencias circulares")
+
+    def ejecutar(self):
+        """
+        Ejecuta todas las etapas respetando las dependencias
+
+        Returns:
+            dict: {nombre_etapa: resultado}
+
+        Raises:
+            Exception: La primera excepción de una etapa (las que aún no
+            habían empezado se cancelan)
+        """
+        self._validar()
+        resultados = {}
+        en_curso = {}
+        sin_lanzar = dict(self.etapas)
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="etapa") as pool:
+            while sin_lanzar or en_curso:
+                if error is None:
+                    listas = [
+                        n for n, (_, deps) in sin_lanzar.items()
+                        if all(d in resultados for d in deps)
+                    ]
+                    for nombre in listas:
+                        funcion, deps = sin_lanzar.pop(nombre)
+                        if self.instrumentacion is not None:
+                            funcion = self.instrumentacion.envolver(nombre, funcion)
+                        args = [resultados[d] for d in deps]
+                        en_curso[pool.submit(funcion, *args)] = nombre
+                else:
+                    sin_lanzar.clear()
+
+                if not en_curso:
+                    break
+
+                hechos, _ = wait(list(en_curso), return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    nombre = en_curso.pop(futuro)
+                    try:
+                        resultados[nombre] = futuro.result()
+                    except Exception as e:
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        return resultados
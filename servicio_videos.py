@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import io
+
+# Forzar UTF-8 en Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+"""
+Servicio persistente de frases y videos
+Mantiene GeneradorMindfulness y GeneradorVideoPexels cargados (MoviePy, NumPy,
+Pillow, fuentes, sesión HTTP, Cloudinary) y recibe trabajos por un socket TCP
+local, así cada ciclo del bot solo paga el trabajo en sí y no el arranque de
+Python y sus imports
+
+Protocolo: una línea JSON por mensaje.
+  Petición:  {"id": 1, "tipo": "frases", "num_frases": 3}
+             {"id": 2, "tipo": "video", "perfil": "fast"}
+             {"id": 5, "tipo": "lote", "num_temas": 12, "frases_por_tema": 6}
+             {"id": 3, "tipo": "ping"}            -> {"pid": ..., "bufer": true}
+             {"id": 4, "tipo": "detener"}
+  Eventos:   {"id": 1, "evento": "inicio", "tipo": "frases"}
+             {"id": 1, "evento": "fin", "ok": true, "segundos": 4.2, "resultado": {...}}
+             {"id": 1, "evento": "fin", "ok": false, "error": "..."}
+"""
+
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+
+
+HOST_DEFAULT = "127.0.0.1"
+PUERTO_DEFAULT = int(os.getenv("VIDEOLYZER_PUERTO", "8765"))
+
+
+class ServicioVideos:
+    """
+    Generadores calientes compartidos por todas las conexiones
+
+    Los trabajos se ejecutan de uno en uno (un video usa toda la CPU y los
+    generadores guardan estado por ejecución, como las métricas).
+    """
+
+    def __init__(self, json_path="mindfulness.json", opciones_video=None, almacen="", bufer=False):
+        """
+        Args:
+            json_path (str): JSON que escribe el generador de frases y lee el de videos
+            opciones_video (dict): Opciones por defecto de generar_video (perfil, paralelo...)
+            almacen (str): Almacén SQLite de frases ("" = el de por defecto, None = solo el JSON)
+            bufer (bool): Reponer el búfer de frases en segundo plano y sacar de él las frases
+                de cada video (sin búfer los videos leen solo el JSON)
+        """
+        self.json_path = json_path
+        self.almacen = almacen
+        self.bufer = bufer
+        self.opciones_video = opciones_video or {}
+        self._frases = None
+        self._videos = None
+        self._lock = threading.Lock()
+        self.detener = threading.Event()
+
+    @property
+    def generador_frases(self):
+        if self._frases is None:
+            from generador_mindfulness import GeneradorMindfulness
+            self._frases = GeneradorMindfulness(archivo_json=self.json_path, almacen=self.almacen or None)
+        return self._frases
+
+    @property
+    def generador_videos(self):
+        if self._videos is None:
+            from videolyzer import GeneradorVideoPexels
+            # Sin búfer el trabajo 'frases' escribe el JSON: no leer conjuntos viejos del almacén
+            self._videos = GeneradorVideoPexels(resolucion=(1080, 1920), json_path=self.json_path,
+                                                almacen_frases=self.almacen if self.bufer else None)
+        return self._videos
+
+    def precalentar(self):
+        """Carga los generadores antes del primer trabajo"""
+        inicio = time.perf_counter()
+        try:
+            # Prompts y cuerpos de petición listos: los trabajos 'frases' solo envían
+            self.generador_frases.precompilar_prompts(3)
+        except Exception as e:
+            # Sin API key de Groq: los trabajos 'frases' fallarán, los de video no
+            print(f"⚠️ Generador de frases no disponible: {e}")
+        # videolyzer importa MoviePy y crea descargas/texto/voz al primer uso: hacerlo ya
+        self.generador_videos.precargar()
+        print(f"🔥 Generadores cargados en {time.perf_counter() - inicio:.1f}s")
+    
+    def iniciar_bufer(self):
+        """Arranca la reposición del búfer de frases en segundo plano"""
+        try:
+            self.generador_frases.iniciar_bufer()
+            print(f"📦 Búfer de frases activo ({self.generador_frases.almacen.conjuntos_disponibles()} conjuntos listos)")
+            return True
+        except Exception as e:
+            print(f"⚠️ Búfer de frases no disponible: {e}")
+            self.bufer = False
+            if self._videos is not None:
+                self._videos.almacen_frases = None
+            return False
+
+    def ejecutar(self, trabajo):
+        """
+        Ejecuta un trabajo y devuelve su resultado serializable
+
+        Raises:
+            ValueError: Tipo de trabajo desconocido
+            Exception: Cualquier error del trabajo (el servicio sigue vivo)
+        """
+        tipo = trabajo.get("tipo")
+
+        if tipo == "ping":
+            return {"pid": os.getpid(), "bufer": self.bufer}
+
+        if tipo == "detener":
+            self.detener.set()
+            if self._frases is not None:
+                self._frases.detener_bufer()
+            return {}
+
+        with self._lock:
+            if tipo == "frases":
+                gen = self.generador_frases
+                ok = gen.ejecutar_una_vez(
+                    num_frases=trabajo.get("num_frases", 3),
+                    mostrar=trabajo.get("mostrar", True)
+                )
+                if not ok:
+                    raise RuntimeError("No se pudieron generar frases")
+                return {"archivo": gen.archivo_json}
+            
+            if tipo == "lote":
+                gen = self.generador_frases
+                ok = gen.ejecutar_lote(
+                    num_temas=trabajo.get("num_temas"),
+                    frases_por_tema=trabajo.get("frases_por_tema", 6),
+                    concurrencia=trabajo.get("concurrencia"),
+                    mostrar=trabajo.get("mostrar", False)
+                )
+                if not ok:
+                    raise RuntimeError("No se pudieron generar frases")
+                return {"almacen": gen.almacen.ruta, "conjuntos": gen.almacen.conjuntos_disponibles()}
+
+            if tipo == "video":
+                opciones = dict(self.opciones_video)
+                opciones.update(trabajo.get("opciones", {}))
+                archivo, respuesta = self.generador_videos.generar_video(**opciones)
+                return {
+                    "archivo": archivo,
+                    "url": respuesta.get("secure_url") if respuesta else None
+                }
+
+        raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+
+
+class _ManejadorConexion(socketserver.StreamRequestHandler):
+    """Atiende una conexión: lee peticiones línea a línea y responde con eventos"""
+
+    def enviar(self, evento):
+        self.wfile.write((json.dumps(evento, ensure_ascii=False) + "\n").encode('utf-8'))
+        self.wfile.flush()
+
+    def handle(self):
+        servicio = self.server.servicio
+
+        for linea in self.rfile:
+            linea = linea.strip()
+            if not linea:
+                continue
+
+            try:
+                trabajo = json.loads(linea)
+            except json.JSONDecodeError as e:
+                self.enviar({"evento": "fin", "ok": False, "error": f"JSON inválido: {e}"})
+                continue
+
+            id_trabajo = trabajo.get("id")
+            tipo = trabajo.get("tipo")
+            self.enviar({"id": id_trabajo, "evento": "inicio", "tipo": tipo})
+            print(f"\n📥 Trabajo #{id_trabajo}: {tipo}")
+
+            inicio = time.perf_counter()
+            try:
+                resultado = servicio.ejecutar(trabajo)
+                evento = {"ok": True, "resultado": resultado}
+                print(f"📤 Trabajo #{id_trabajo} completado en {time.perf_counter() - inicio:.1f}s")
+            except Exception as e:
+                traceback.print_exc()
+                evento = {"ok": False, "error": str(e)}
+                print(f"❌ Trabajo #{id_trabajo} falló: {e}")
+
+            self.enviar({
+                "id": id_trabajo,
+                "evento": "fin",
+                "tipo": tipo,
+                "segundos": round(time.perf_counter() - inicio, 2),
+                **evento
+            })
+
+            if servicio.detener.is_set():
+                # shutdown() espera a serve_forever: llamarlo desde otro hilo
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class ServidorTrabajos(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, direccion, servicio):
+        self.servicio = servicio
+        super().__init__(direccion, _ManejadorConexion)
+
+
+def iniciar_servicio(host=HOST_DEFAULT, puerto=PUERTO_DEFAULT, json_path="mindfulness.json",
+                     opciones_video=None, precalentar=True, almacen="", bufer=False):
+    """Arranca el servicio y atiende trabajos hasta recibir 'detener' o Ctrl+C"""
+    servicio = ServicioVideos(json_path=json_path, opciones_video=opciones_video,
+                              almacen=almacen, bufer=bufer)
+    if precalentar:
+        servicio.precalentar()
+    if bufer:
+        servicio.iniciar_bufer()
+
+    with ServidorTrabajos((host, puerto), servicio) as servidor:
+        print(f"🟢 Servicio escuchando en {host}:{servidor.server_address[1]}")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print("🛑 Servicio detenido")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servicio persistente de frases y videos (JSON por socket TCP local)')
+    parser.add_argument('--host', default=HOST_DEFAULT, help='Dirección de escucha (default: solo local)')
+    parser.add_argument('--puerto', type=int, default=PUERTO_DEFAULT, help='Puerto TCP')
+    parser.add_argument('--json', default='mindfulness.json', help='Archivo JSON de frases')
+    parser.add_argument('--almacen', default='', metavar='DB',
+                        help='Búfer de frases de los videos (almacén SQLite, default: frases.db)')
+    parser.add_argument('--bufer', action='store_true',
+                        help='Reponer el búfer de frases en segundo plano (los trabajos "frases" sobran)')
+    parser.add_argument('--perfil', default=None, help='Perfil de exportación por defecto de los videos')
+    parser.add_argument('--paralelo', action='store_true', help='Exportar los videos por segmentos en paralelo')
+    parser.add_argument('--sin-precalentar', action='store_true', help='Cargar los generadores en el primer trabajo')
+    args = parser.parse_args()
+
+    opciones = {"paralelo": args.paralelo}
+    if args.perfil:
+        opciones["perfil"] = args.perfil
+
+    try:
+        iniciar_servicio(args.host, args.puerto, json_path=args.json,
+                         opciones_video=opciones, precalentar=not args.sin_precalentar,
+                         almacen=args.almacen, bufer=args.bufer)
+    except Exception as e:
+        print(f"\n❌ Error en el servicio: {e}\n")
+        traceback.print_exc()
+        sys.exit(1)
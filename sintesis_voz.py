@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Síntesis de voz (TTS) para los videos
+Sintetiza todos los textos de un video a la vez bajo un único event loop de
+edge-tts (con gTTS como respaldo) y lee la duración de la cabecera MP3 sin
+abrir el audio con MoviePy. Los audios quedan en una caché persistente
+indexada por texto, motor, voz, velocidad y tono
+"""
+
+import os
+import sys
+import asyncio
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# Solo se comprueba que esté instalado: edge_tts (aiohttp) y gTTS se importan
+# al sintetizar, así que importar este módulo no cuesta nada
+TIENE_EDGE_TTS = importlib.util.find_spec("edge_tts") is not None
+
+from cache_medios import CacheMedios
+
+
+# Tablas de cabecera MPEG audio (solo Layer III, que es lo que generan edge-tts y gTTS)
+_BITRATES_KBPS = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+}
+_FRECUENCIAS = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000]    # MPEG-2.5
+}
+
+
+def duracion_mp3(path):
+    """
+    Duración en segundos de un MP3 (Layer III) recorriendo las cabeceras de frame
+
+    Returns:
+        float: Duración, o None si el archivo no es un MP3 reconocible
+    """
+    with open(path, 'rb') as f:
+        datos = f.read()
+
+    pos = 0
+    # Saltar etiqueta ID3v2
+    if datos[:3] == b'ID3' and len(datos) >= 10:
+        tam = (datos[6] << 21) | (datos[7] << 14) | (datos[8] << 7) | datos[9]
+        pos = 10 + tam + (10 if datos[5] & 0x10 else 0)
+
+    muestras_total = 0
+    frecuencia = None
+    primero = True
+    n = len(datos)
+
+    while pos + 4 <= n:
+        if datos[pos] != 0xFF or (datos[pos + 1] & 0xE0) != 0xE0:
+            pos += 1
+            continue
+
+        version = (datos[pos + 1] >> 3) & 0x03
+        capa = (datos[pos + 1] >> 1) & 0x03
+        idx_bitrate = (datos[pos + 2] >> 4) & 0x0F
+        idx_frec = (datos[pos + 2] >> 2) & 0x03
+        relleno = (datos[pos + 2] >> 1) & 0x01
+
+        if version == 1 or capa != 1 or idx_frec == 3 or idx_bitrate in (0, 15):
+            pos += 1
+            continue
+
+        bitrate = _BITRATES_KBPS['mpeg1' if version == 3 else 'mpeg2'][idx_bitrate] * 1000
+        frecuencia = _FRECUENCIAS[version][idx_frec]
+        muestras = 1152 if version == 3 else 576
+
+        largo = (muestras // 8) * bitrate // frecuencia + relleno
+        if largo <= 4:
+            pos += 1
+            continue
+
+        # El primer frame puede ser la cabecera Xing/Info de LAME (no contiene audio)
+        if not (primero and (b'Xing' in datos[pos + 4:pos + 40] or b'Info' in datos[pos + 4:pos + 40])):
+            muestras_total += muestras
+        primero = False
+        pos += largo
+
+    if not frecuencia or not muestras_total:
+        return None
+    return muestras_total / frecuencia
+
+
+class SintetizadorVoz:
+    """
+    Genera los audios de un video en paralelo
+
+    Voz grave y pausada: es-ES-AlvaroNeural a -15% de velocidad y -25Hz.
+    """
+
+    VOZ = "es-ES-AlvaroNeural"
+    RATE = "-15%"   # Más lenta
+    PITCH = "-25Hz"  # Más grave
+    MAX_SIMULTANEAS = 4
+
+    def __init__(self, directorio, voz=None, rate=None, pitch=None, cache=None):
+        """
+        Args:
+            directorio (str): Carpeta donde se escriben los MP3 recién sintetizados
+            voz (str): Voz de edge-tts
+            rate (str): Velocidad relativa (p.ej. "-15%")
+            pitch (str): Tono relativo (p.ej. "-25Hz")
+            cache (CacheMedios): Caché persistente de audios (None = sin caché)
+        """
+        self.directorio = directorio
+        self.voz = voz or self.VOZ
+        self.rate = rate or self.RATE
+        self.pitch = pitch or self.PITCH
+        self.cache = cache
+        # Callback opcional (origen, bytes) con el tamaño de cada MP3 recibido (ver instrumentacion.py)
+        self.al_transferir = None
+
+    def _clave(self, texto, motor):
+        """Clave estable: el mismo texto con la misma voz siempre da el mismo audio"""
+        if motor == 'edge-tts':
+            return CacheMedios.clave("tts", motor, self.voz, self.rate, self.pitch, texto)
+        return CacheMedios.clave("tts", motor, "es", "slow", texto)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"audio_{clave[:16]}.mp3")
+
+    async def _edge_lote(self, textos, rutas):
+        import edge_tts
+        limite = asyncio.Semaphore(self.MAX_SIMULTANEAS)
+
+        async def uno(texto, ruta):
+            async with limite:
+                comm = edge_tts.Communicate(texto, self.voz, rate=self.rate, pitch=self.pitch)
+                await comm.save(ruta)
+
+        return await asyncio.gather(
+            *(uno(t, r) for t, r in zip(textos, rutas)),
+            return_exceptions=True
+        )
+
+    def _gtts(self, texto, ruta):
+        from gtts import gTTS
+        gTTS(text=texto, lang='es', slow=True).save(ruta)
+
+    @staticmethod
+    def _duracion(ruta):
+        dur = duracion_mp3(ruta)
+        if dur is None:
+            # Formato inesperado: dejar que ffmpeg lo mida
+            from moviepy.editor import AudioFileClip
+            audio_clip = AudioFileClip(ruta)
+            dur = audio_clip.duration
+            audio_clip.close()
+        return dur
+
+    def sintetizar(self, textos):
+        """
+        Sintetiza todos los textos bajo un único event loop
+
+        Args:
+            textos (list): Textos a locutar
+
+        Returns:
+            list: [(ruta_mp3, duracion_segundos)] en el mismo orden que textos
+        """
+        motor = 'edge-tts' if TIENE_EDGE_TTS else 'gtts'
+        # Un texto repetido comparte clave y archivo: se sintetiza una sola vez
+        unicos = list(dict.fromkeys(textos))
+        audios = {}
+
+        # Aciertos de caché: ni red ni síntesis
+        for texto in unicos:
+            cacheado = self._desde_cache(self._clave(texto, motor))
+            if cacheado:
+                audios[texto] = cacheado
+
+        pendientes = [t for t in unicos if t not in audios]
+        if pendientes:
+            print(f"   🎙️ Sintetizando {len(pendientes)} audios ({len(unicos) - len(pendientes)} en caché)")
+        fallidos = pendientes
+
+        if pendientes and TIENE_EDGE_TTS:
+            claves = [self._clave(t, 'edge-tts') for t in pendientes]
+            rutas = [self._ruta(clave) for clave in claves]
+            try:
+                if sys.platform == 'win32':
+                    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+                resultados = asyncio.run(self._edge_lote(pendientes, rutas))
+            except Exception:
+                resultados = None
+
+            if resultados is not None:
+                fallidos = []
+                for texto, clave, ruta, r in zip(pendientes, claves, rutas, resultados):
+                    # Cada audio que falla (en la red o al guardarlo) pasa al respaldo
+                    if isinstance(r, Exception):
+                        fallidos.append(texto)
+                        continue
+                    try:
+                        audios[texto] = self._guardar(clave, ruta)
+                    except Exception:
+                        fallidos.append(texto)
+
+        # Respaldo con gTTS solo para los que fallaron en edge-tts
+        if fallidos:
+            def con_gtts(texto):
+                clave = self._clave(texto, 'gtts')
+                cacheado = self._desde_cache(clave)
+                if cacheado:
+                    return cacheado
+                ruta = self._ruta(clave)
+                self._gtts(texto, ruta)
+                return self._guardar(clave, ruta)
+
+            with ThreadPoolExecutor(max_workers=self.MAX_SIMULTANEAS) as pool:
+                for texto, resultado in zip(fallidos, pool.map(con_gtts, fallidos)):
+                    audios[texto] = resultado
+
+        return [audios[texto] for texto in textos]
+
+    def _desde_cache(self, clave):
+        if self.cache is None:
+            return None
+        ruta = self.cache.obtener(clave)
+        if ruta is None:
+            return None
+        dur = self.cache.meta(clave).get("duracion")
+        return ruta, dur if dur is not None else self._duracion(ruta)
+
+    def _guardar(self, clave, ruta):
+        """Registra un audio recién sintetizado (descargado del servicio de TTS)"""
+        if self.al_transferir is not None:
+            self.al_transferir('tts', os.path.getsize(ruta))
+        dur = self._duracion(ruta)
+        if self.cache is not None:
+            ruta = self.cache.guardar_archivo(clave, ruta, ".mp3", meta={"duracion": dur})
+        return ruta, dur
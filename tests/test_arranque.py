@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Presupuesto de arranque de 'import videolyzer' (el CLI y el servicio lo importan siempre)"""
+
+import json
+import os
+import subprocess
+import sys
+
+RUTA_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESUPUESTO_S = 0.3
+REPETICIONES = 3
+# Se importan al renderizar, descargar o subir, nunca al arrancar
+MODULOS_PESADOS = ("moviepy", "imageio", "numpy", "PIL", "requests", "edge_tts", "gtts", "cloudinary")
+
+_CODIGO = "import sys, json, videolyzer; print(json.dumps(sorted(m for m in %r if m in sys.modules)))"
+
+
+def importar_videolyzer():
+    """(segundos acumulados de 'import videolyzer' según -X importtime, módulos pesados cargados)"""
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CODIGO % (MODULOS_PESADOS,)],
+        cwd=RUTA_BASE, capture_output=True, text=True, check=True
+    )
+    # Líneas 'import time: self [us] | cumulative | imported package'
+    for linea in resultado.stderr.splitlines():
+        partes = linea.split('|')
+        if len(partes) == 3 and partes[2].strip() == 'videolyzer':
+            segundos = int(partes[1]) / 1e6
+            break
+    else:
+        raise AssertionError("-X importtime no informó de videolyzer")
+    return segundos, json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def test_import_sin_modulos_pesados():
+    _, pesados = importar_videolyzer()
+    assert pesados == []
+
+
+def test_import_dentro_del_presupuesto():
+    # El mejor de varios intérpretes limpios: descarta el ruido de la máquina
+    segundos = min(importar_videolyzer()[0] for _ in range(REPETICIONES))
+    assert segundos <= PRESUPUESTO_S, f"import videolyzer tardó {segundos * 1000:.0f} ms"
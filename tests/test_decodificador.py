@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Bucles de clips de stock cortos (decodificador.py)"""
+
+import os
+import subprocess
+
+import pytest
+
+moviepy_config = pytest.importorskip("moviepy.config")
+
+from decodificador import ClipVertical, LectorVertical
+
+
+@pytest.fixture
+def clip_corto(tmp_path):
+    """Clip horizontal típico de Pexels: 6 s a 30 fps (más corto que un segmento)"""
+    ruta = str(tmp_path / "corto.mp4")
+    subprocess.run([
+        moviepy_config.get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', 'testsrc=duration=6:size=1280x720:rate=30',
+        '-pix_fmt', 'yuv420p', ruta
+    ], check=True)
+    return ruta
+
+
+def test_bucle_usa_el_intermedio(clip_corto, tmp_path):
+    clip = ClipVertical(clip_corto, (1080, 1920), 14, fps=30, directorio=str(tmp_path))
+    try:
+        # El bucle se lee del intermedio ya escalado, no del original
+        assert clip.ruta_bucle is not None
+        assert clip.lector.ruta == clip.ruta_bucle
+        assert clip.lector.bucle
+        # Un búfer crudo de 6 s a 1080x1920 ocuparía ~1 GB
+        assert os.path.getsize(clip.ruta_bucle) < 50 * 1024 * 1024
+
+        original = LectorVertical(clip_corto, (1080, 1920), 30, 14, bucle=True, periodo=6)
+        try:
+            for indice in (0, 100, 200, 300, 190):  # segunda y tercera vuelta, y hacia atrás
+                cuadro = clip.get_frame(indice / 30)
+                assert cuadro.shape == (1920, 1080, 3)
+                diferencia = abs(cuadro.astype(int) - original.cuadro(indice).astype(int)).mean()
+                assert diferencia < 3
+        finally:
+            original.cerrar()
+    finally:
+        ruta = clip.ruta_bucle
+        clip.close()
+    assert not os.path.exists(ruta)
+
+
+def test_clip_largo_sin_intermedio(clip_corto):
+    clip = ClipVertical(clip_corto, (1080, 1920), 4, fps=30)
+    try:
+        assert clip.ruta_bucle is None
+        assert not clip.lector.bucle
+        assert clip.get_frame(3.9).shape == (1920, 1080, 3)
+    finally:
+        clip.close()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de texto superpuesto para los videos verticales
+Cachea fuentes y medidas, dibuja la sombra una sola vez como máscara dilatada
+y devuelve capas recortadas a la caja del texto (no lienzos de 1080x1920)
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+
+RUTAS_FUENTE = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "arial.ttf"
+]
+
+
+@lru_cache(maxsize=8)
+def cargar_fuente(tamanio):
+    """Carga la fuente TrueType una sola vez por tamaño"""
+    for ruta in RUTAS_FUENTE:
+        try:
+            return ImageFont.truetype(ruta, tamanio)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+class CapaTexto:
+    """Capa RGBA recortada y su posición (x, y) dentro del fotograma"""
+
+    def __init__(self, rgb, alfa, posicion):
+        self.rgb = rgb            # uint8 (h, w, 3)
+        self.alfa = alfa          # float32 (h, w) en 0..1
+        self.posicion = posicion  # esquina superior izquierda en el fotograma
+
+    @property
+    def tamanio(self):
+        return self.rgb.shape[1], self.rgb.shape[0]
+
+
+class RenderizadorTexto:
+    """
+    Renderiza frases centradas con sombra para formato vertical
+
+    Las capas generadas se guardan por frase, así que la misma frase (p.ej.
+    la intro "Tres frases sobre ...") no se vuelve a dibujar. Las cachés
+    tienen tamaño fijo: el servicio y el modo lote usan un solo renderizador
+    durante todo el proceso.
+    """
+
+    MAX_CAPAS = 8       # LRU: la intro y las frases de los últimos videos
+    MAX_ANCHOS = 4096   # Medidas de líneas; al llenarse se vacía
+
+    def __init__(self, resolucion, tamanio_fuente=60, interlineado=80,
+                 margen_lateral=100, sombra=3, alfa_sombra=200):
+        """
+        Args:
+            resolucion (tuple): (ancho, alto) del video
+            tamanio_fuente (int): Tamaño de la fuente en px
+            interlineado (int): Altura de cada línea en px
+            margen_lateral (int): Margen total a repartir entre ambos lados
+            sombra (int): Radio de la sombra en px
+            alfa_sombra (int): Opacidad de la sombra (0-255)
+        """
+        self.resolucion = resolucion
+        self.font = cargar_fuente(tamanio_fuente)
+        self.interlineado = interlineado
+        self.max_width = resolucion[0] - margen_lateral
+        self.sombra = sombra
+        self.alfa_sombra = alfa_sombra
+        self._anchos = {}
+        self._capas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _ancho(self, texto):
+        """Ancho del texto en px (cacheado: las mismas palabras se miden muchas veces)"""
+        ancho = self._anchos.get(texto)
+        if ancho is None:
+            bbox = self.font.getbbox(texto)
+            if len(self._anchos) >= self.MAX_ANCHOS:
+                self._anchos.clear()
+            ancho = self._anchos[texto] = bbox[2] - bbox[0]
+        return ancho
+
+    def partir_lineas(self, frase):
+        """Divide la frase en líneas que caben en el ancho disponible"""
+        lines = []
+        current_line = ""
+
+        for palabra in frase.split():
+            test_line = (current_line + " " + palabra).strip()
+
+            if self._ancho(test_line) <= self.max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line)
+                    current_line = palabra
+                else:
+                    # Si una sola palabra es muy larga, va sola en su línea
+                    lines.append(palabra)
+                    current_line = ""
+
+        if current_line:
+            lines.append(current_line)
+
+        return lines or [frase]
+
+    def renderizar(self, frase):
+        """
+        Devuelve la CapaTexto de la frase, centrada en el fotograma
+
+        Solo se dibuja la caja que ocupa el texto más el margen de la sombra.
+        """
+        with self._lock:
+            capa = self._capas.get(frase)
+            if capa is None:
+                capa = self._capas[frase] = self._dibujar(frase)
+                if len(self._capas) > self.MAX_CAPAS:
+                    self._capas.popitem(last=False)
+            else:
+                self._capas.move_to_end(frase)
+            return capa
+
+    def _dibujar(self, frase):
+        lines = self.partir_lineas(frase)
+
+        center_x = self.resolucion[0] // 2
+        center_y = self.resolucion[1] // 2
+        total_height = len(lines) * self.interlineado
+        start_y = center_y - (total_height // 2) + (self.interlineado // 2)
+        posiciones = [(center_x, start_y + i * self.interlineado) for i in range(len(lines))]
+
+        # Caja que contiene todas las líneas (anclaje middle-middle) + sombra
+        cajas = [
+            self.font.getbbox(line, anchor='mm')
+            for line in lines
+        ]
+        x0 = min(px + c[0] for (px, _), c in zip(posiciones, cajas)) - self.sombra - 1
+        y0 = min(py + c[1] for (_, py), c in zip(posiciones, cajas)) - self.sombra - 1
+        x1 = max(px + c[2] for (px, _), c in zip(posiciones, cajas)) + self.sombra + 1
+        y1 = max(py + c[3] for (_, py), c in zip(posiciones, cajas)) + self.sombra + 1
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.resolucion[0], x1), min(self.resolucion[1], y1)
+
+        # Máscara del texto en coordenadas locales de la caja
+        mascara = Image.new('L', (x1 - x0, y1 - y0), 0)
+        draw = ImageDraw.Draw(mascara)
+        for line, (px, py) in zip(lines, posiciones):
+            draw.text((px - x0, py - y0), line, font=self.font, fill=255, anchor='mm')
+
+        # Sombra = máscara dilatada (equivale a dibujar el texto desplazado en todo el cuadrado)
+        sombra = mascara.filter(ImageFilter.MaxFilter(2 * self.sombra + 1))
+
+        a_texto = np.asarray(mascara, dtype=np.float32) / 255.0
+        a_sombra = np.asarray(sombra, dtype=np.float32) / 255.0 * (self.alfa_sombra / 255.0)
+
+        # Texto blanco sobre sombra negra ("over"), en color no premultiplicado
+        alfa = a_texto + a_sombra * (1.0 - a_texto)
+        blanco = np.divide(a_texto, alfa, out=np.zeros_like(alfa), where=alfa > 0)
+        rgb = np.repeat((blanco * 255.0 + 0.5).astype(np.uint8)[:, :, None], 3, axis=2)
+
+        return CapaTexto(rgb, alfa, (x0, y0))
+
+
+def superponer_texto(clip_fondo, capa, duracion, fundido=0.3):
+    """
+    Superpone una CapaTexto sobre un clip mezclando solo su rectángulo
+
+    Equivale a CompositeVideoClip([clip_fondo, texto.fadein().fadeout()]) pero
+    sin recomponer el fotograma entero: se copia el fondo y solo se mezclan
+    los píxeles de la caja del texto con valores premultiplicados de antemano.
+
+    Args:
+        clip_fondo: Clip de MoviePy de tamaño igual o mayor que el video
+        capa (CapaTexto): Capa devuelta por RenderizadorTexto.renderizar()
+        duracion (float): Duración del segmento (para el fade out)
+        fundido (float): Segundos de fade in/out del texto
+    """
+    x0, y0 = capa.posicion
+    ancho, alto = capa.tamanio
+    x1, y1 = x0 + ancho, y0 + alto
+    # Igual que CompositeVideoClip: el tamaño del segmento es el del fondo en t=0
+    ancho_fondo, alto_fondo = clip_fondo.size
+
+    alfa = capa.alfa[:, :, None]
+    inverso = 1.0 - alfa
+    premultiplicado = capa.rgb.astype(np.float32) * alfa
+
+    def filtro(get_frame, t):
+        frame = get_frame(t)
+        frame = np.array(frame[:alto_fondo, :ancho_fondo], dtype=np.uint8, copy=True)
+        region = frame[y0:y1, x0:x1]
+        mezcla = region * inverso + premultiplicado * factor_fundido(t, duracion, fundido)
+        region[...] = (mezcla + 0.5).astype(np.uint8)
+        return frame
+
+    return clip_fondo.fl(filtro)
+
+
+def factor_fundido(t, duracion, fundido=0.3):
+    """Factor de clip.fadein(fundido).fadeout(fundido) en el instante t (0 = negro)"""
+    if fundido <= 0:
+        return 1.0
+    return max(0.0, min(1.0, t / fundido, (duracion - t) / fundido))
+
+
+def fotogramas_estaticos(fondo, capa, duracion, fundido=0.3):
+    """
+    Función de fotogramas de un segmento cuyo fondo no cambia (imagen con fundido)
+
+    El texto se mezcla con el fondo una sola vez. Fondo y texto hacen el mismo
+    fundido desde/hacia negro, así que cada fotograma es el compuesto por el
+    factor de fundido: en la parte central se devuelve siempre el mismo array
+    y solo los fotogramas de los fundidos cuestan una multiplicación.
+
+    Args:
+        fondo (np.ndarray): Imagen (alto, ancho, 3) uint8 del tamaño del video
+        capa (CapaTexto): Capa devuelta por RenderizadorTexto.renderizar()
+        duracion (float): Duración del segmento
+        fundido (float): Segundos de fade in/out
+
+    Returns:
+        callable: make_frame(t) para un VideoClip de MoviePy
+    """
+    x0, y0 = capa.posicion
+    ancho, alto = capa.tamanio
+
+    compuesto = np.array(fondo, dtype=np.uint8, copy=True)
+    region = compuesto[y0:y0 + alto, x0:x0 + ancho]
+    alfa = capa.alfa[:, :, None]
+    mezcla = region * (1.0 - alfa) + capa.rgb.astype(np.float32) * alfa
+    region[...] = (mezcla + 0.5).astype(np.uint8)
+    # Se entrega el mismo array en cada fotograma: que nadie lo modifique
+    compuesto.setflags(write=False)
+
+    def make_frame(t):
+        factor = factor_fundido(t, duracion, fundido)
+        if factor >= 1.0:
+            return compuesto
+        return (compuesto * np.float32(factor)).astype(np.uint8)
+
+    return make_frame
@@ -16,49 +16,65 @@ Formato 9:16 (1080x1920) con texto SIEMPRE CENTRADO
 """
 
 import random
-import requests
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
 import json
 from datetime import datetime
 import time
+import importlib.util
 from dotenv import load_dotenv
 load_dotenv()
 
-try:
-    import cloudinary
-    import cloudinary.uploader
-    TIENE_CLOUDINARY = True
-except ImportError:
-    TIENE_CLOUDINARY = False
+# MoviePy (imageio, numpy, proglog), Pillow, cloudinary y los motores de TTS
+# se importan al usarse: subir un video ya hecho o revisar el JSON no carga
+# el motor de render
+TIENE_CLOUDINARY = importlib.util.find_spec("cloudinary") is not None
+if not TIENE_CLOUDINARY:
     print("⚠️ Instala cloudinary: pip install cloudinary")
 
-try:
-    from moviepy.editor import (
-        VideoFileClip, ImageClip, CompositeVideoClip, 
-        concatenate_videoclips, AudioFileClip
-    )
-except ImportError as e:
-    print(f"Error: No se puede importar MoviePy: {e}")
-    exit(1)
+TIENE_MOVIEPY = importlib.util.find_spec("moviepy") is not None
 
-try:
-    import edge_tts
-    import asyncio
-    TIENE_EDGE_TTS = True
-except ImportError:
-    TIENE_EDGE_TTS = False
-
-from gtts import gTTS
 import tempfile
 import os
 import colorsys
+import re
+import unicodedata
+
+from cache_medios import CacheMedios
+from sintesis_voz import TIENE_EDGE_TTS
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from planificador import PlanificadorEtapas
+from instrumentacion import Instrumentacion
+from contextlib import nullcontext
+import subprocess
 
 
 class GeneradorVideoPexels:
     PEXELS_API_KEY = os.getenv("PEXELS_API_KEY", "")
     EFECTOS = ['zoom_in', 'zoom_out', 'pan_left', 'pan_right', 'fade']
     IDEAS_BUSQUEDA = ["mindfulness", "yoga", "meditation", "zen", "spiritual", "hindu", "La India", "karma", "dharma", "hinduismo", "budismo"]
+    # Las búsquedas se repiten (ideas y páginas fijas): reutilizar la respuesta un día
+    CACHE_BUSQUEDAS_SEGUNDOS = 24 * 3600
+    # Límite por clip descargado (el worker tiene poca memoria y disco)
+    MAX_MB_POR_CLIP = int(os.getenv("VIDEOLYZER_MAX_MB_CLIP", "80"))
+    MAX_MB_CACHE_TTS = int(os.getenv("VIDEOLYZER_CACHE_TTS_MB", "200"))
+    
+    # Perfiles de exportación x264 (solo CPU). 'balanced' reproduce el ajuste histórico
+    FPS_SALIDA = 30  # 30 FPS para Instagram
+    PERFILES_EXPORTACION = {
+        'fast': {
+            'preset': 'veryfast', 'crf': 23, 'bitrate': None,
+            'tune': None, 'gop': 60, 'threads': None
+        },
+        'balanced': {
+            'preset': 'medium', 'crf': None, 'bitrate': '5000k',
+            'tune': None, 'gop': 250, 'threads': None
+        },
+        'archive': {
+            'preset': 'slow', 'crf': 18, 'bitrate': None,
+            'tune': 'film', 'gop': 300, 'threads': None
+        }
+    }
+    PERFIL_DEFAULT = os.getenv("VIDEOLYZER_PERFIL", "balanced")
     
     CLOUDINARY_DEFAULTS = {
     'cloud_name': os.getenv('CLOUDINARY_CLOUD_NAME', ''),
@@ -67,12 +83,26 @@ class GeneradorVideoPexels:
 }
     
     def __init__(self, api_key=None, resolucion=(1080, 1920), json_path=None, 
-                 cloudinary_cloud_name=None, cloudinary_api_key=None, cloudinary_api_secret=None):
+                 cloudinary_cloud_name=None, cloudinary_api_key=None, cloudinary_api_secret=None,
+                 usar_cloudinary=True, almacen_frases=None):
         self.api_key = api_key or self.PEXELS_API_KEY
         # FORMATO VERTICAL INSTAGRAM (9:16)
         self.resolucion = resolucion
         self.temp_dir = tempfile.mkdtemp()
         self.json_path = json_path or "mindfulness.json"
+        # Búfer de frases (almacén SQLite que repone generador_mindfulness.py):
+        # None = leer solo el JSON, "" = el almacén por defecto
+        self.almacen_frases = almacen_frases
+        self._reserva = None  # ids del conjunto del almacén apartado para el video en curso
+        
+        # Caché persistente de fotos/videos de Pexels entre ejecuciones
+        self.cache = CacheMedios()
+        # Descargas, texto y voz se crean al primer uso (ver propiedades)
+        self._descargas = None
+        self._texto = None
+        self._voz = None
+        # Métricas de la ejecución en curso (se crean en generar_video)
+        self.metricas = None
         
         # Generar timestamp único para este video
         self.timestamp = int(time.time())
@@ -81,13 +111,17 @@ class GeneradorVideoPexels:
         # Configurar Cloudinary con valores por defecto si no se proporcionan
         self.cloudinary_configured = False
         
-        if TIENE_CLOUDINARY:
+        if not usar_cloudinary:
+            # Procesos auxiliares (p.ej. render de segmentos) no suben nada
+            pass
+        elif TIENE_CLOUDINARY:
             # Usar credenciales proporcionadas o las por defecto
             cloud_name = cloudinary_cloud_name or self.CLOUDINARY_DEFAULTS['cloud_name']
             api_key = cloudinary_api_key or self.CLOUDINARY_DEFAULTS['api_key']
             api_secret = cloudinary_api_secret or self.CLOUDINARY_DEFAULTS['api_secret']
             
             try:
+                import cloudinary
                 cloudinary.config(
                     cloud_name=cloud_name,
                     api_key=api_key,
@@ -106,8 +140,49 @@ class GeneradorVideoPexels:
             print("❌ Módulo 'cloudinary' no instalado")
             print("   Instala con: pip install cloudinary")
     
+    @property
+    def descargas(self):
+        """Sesión HTTP compartida (keep-alive) y descargas en paralelo"""
+        if self._descargas is None:
+            from descargas import ClienteDescargas
+            self._descargas = ClienteDescargas()
+        return self._descargas
+    
+    @property
+    def texto(self):
+        """Fuentes, medidas y capas de texto cacheadas"""
+        if self._texto is None:
+            from texto_overlay import RenderizadorTexto
+            self._texto = RenderizadorTexto(self.resolucion)
+        return self._texto
+    
+    @property
+    def voz(self):
+        """TTS de todos los segmentos en un solo lote, con caché persistente de audios"""
+        if self._voz is None:
+            from sintesis_voz import SintetizadorVoz
+            cache_tts = CacheMedios(os.path.join(self.cache.directorio, "tts"), max_mb=self.MAX_MB_CACHE_TTS)
+            self._voz = SintetizadorVoz(self.temp_dir, cache=cache_tts)
+        return self._voz
+    
+    def precargar(self):
+        """Importa el motor de render y crea los miembros perezosos (para procesos de larga vida)"""
+        import moviepy.editor  # noqa: F401
+        self.descargas, self.texto, self.voz
+    
+    def _etapa(self, nombre):
+        """Mide una etapa si hay métricas activas"""
+        return self.metricas.etapa(nombre) if self.metricas else nullcontext()
+    
     def subir_a_cloudinary(self, video_path, tema):
         """Sube el video a Cloudinary SOBRESCRIBIENDO el anterior con nombre FIJO"""
+        with self._etapa('subir_cloudinary'):
+            response = self._subir_a_cloudinary(video_path, tema)
+        if response and self.metricas:
+            self.metricas.sumar_bytes('cloudinary', os.path.getsize(video_path))
+        return response
+    
+    def _subir_a_cloudinary(self, video_path, tema):
         if not self.cloudinary_configured:
             print("\n⚠️ Cloudinary no está configurado - video NO subido")
             print(f"   El video está guardado localmente en: {video_path}")
@@ -135,6 +210,7 @@ class GeneradorVideoPexels:
             print(f"{'='*70}\n")
             
             # Subir a Cloudinary CON SOBRESCRITURA
+            import cloudinary.uploader
             response = cloudinary.uploader.upload(
                 video_path,
                 resource_type="video",
@@ -187,8 +263,22 @@ class GeneradorVideoPexels:
             traceback.print_exc()
             return None
     
-    def leer_mindfulness_json(self):
-        """Lee mindfulness.json"""
+    def leer_mindfulness_json(self, reservar=True):
+        """
+        Lee tema y frases: con el búfer de frases activo (almacen_frases, el
+        almacén que repone generador_mindfulness.py en segundo plano) saca el
+        siguiente conjunto y solo si está vacío lee mindfulness.json, así el
+        render nunca espera a Groq
+        
+        Args:
+            reservar (bool): Apartar el conjunto del almacén para este video (False en dry run);
+                se marca como usado al exportar el video (ver _cerrar_reserva)
+        """
+        if self.almacen_frases is not None:
+            conjunto = self._tomar_del_almacen(reservar)
+            if conjunto:
+                return conjunto
+        
         try:
             # Debug: mostrar rutas
             print(f"\n🔍 DEBUG - Buscando archivo JSON:")
@@ -237,6 +327,78 @@ class GeneradorVideoPexels:
         
         return tema, frases
     
+    def _tomar_del_almacen(self, reservar=True):
+        """Conjunto (tema, frases) pendiente del almacén o None si está vacío o falla"""
+        try:
+            from almacen_frases import AlmacenFrases
+            almacen = AlmacenFrases(self.almacen_frases)
+            try:
+                if reservar:
+                    conjunto = almacen.reservar_conjunto(3)
+                    if conjunto:
+                        self._reserva = conjunto[2]
+                else:
+                    conjunto = almacen.tomar_conjunto(3, consumir=False)
+                restantes = almacen.conjuntos_disponibles()
+            finally:
+                almacen.cerrar()
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el almacén de frases ({e}), usando {self.json_path}")
+            return None
+        
+        if conjunto is None:
+            print(f"⚠️ Almacén de frases sin conjuntos pendientes, usando {self.json_path}")
+            return None
+        
+        tema, frases = conjunto[:2]
+        print(f"\n{'='*70}")
+        print(f"📦 CONJUNTO DEL ALMACÉN ({restantes} pendientes)")
+        print(f"{'='*70}")
+        print(f"✅ Tema: {tema}")
+        for i, frase in enumerate(frases, 1):
+            print(f"   {i}. {frase[:60]}{'...' if len(frase) > 60 else ''}")
+        print(f"{'='*70}\n")
+        return tema, frases
+    
+    def _cerrar_reserva(self, usado):
+        """Marca como usado (video exportado) o devuelve al búfer (video fallido) el conjunto reservado"""
+        if self._reserva is None:
+            return
+        ids, self._reserva = self._reserva, None
+        try:
+            from almacen_frases import AlmacenFrases
+            almacen = AlmacenFrases(self.almacen_frases)
+            try:
+                if usado:
+                    almacen.confirmar_reserva(ids)
+                else:
+                    almacen.liberar_reserva(ids)
+                    print("↩️ Conjunto de frases devuelto al búfer")
+            finally:
+                almacen.cerrar()
+        except Exception as e:
+            # Una reserva sin cerrar caduca sola (RESERVA_MAX_S en almacen_frases.py)
+            print(f"⚠️ No se pudo actualizar el almacén de frases: {e}")
+    
+    def _buscar_pexels(self, url, params):
+        """Consulta la API de búsqueda de Pexels reutilizando respuestas recientes de la caché"""
+        clave = CacheMedios.clave("pexels", "busqueda", url, json.dumps(params, sort_keys=True))
+        cacheado = self.cache.obtener(clave, max_edad=self.CACHE_BUSQUEDAS_SEGUNDOS)
+        if cacheado:
+            with open(cacheado, 'r', encoding='utf-8') as f:
+                print(f"   💾 Búsqueda en caché")
+                return json.load(f)
+        
+        headers = {"Authorization": self.api_key}
+        response = self.descargas.get(url, headers=headers, params=params, timeout=10)
+        
+        if response.status_code != 200:
+            print(f"   ⚠️ Error API Pexels: {response.status_code}")
+            return None
+        
+        self.cache.guardar_bytes(clave, response.content, ".json")
+        return response.json()
+    
     def buscar_imagenes_pexels(self, cantidad=5):
         """Busca imágenes en Pexels - MODO VERTICAL"""
         if not self.api_key or self.api_key == "TU_API_KEY_AQUI":
@@ -246,7 +408,6 @@ class GeneradorVideoPexels:
         
         try:
             url = "https://api.pexels.com/v1/search"
-            headers = {"Authorization": self.api_key}
             params = {
                 "query": idea,
                 "per_page": cantidad,
@@ -255,30 +416,30 @@ class GeneradorVideoPexels:
             }
             
             print(f"🔍 Buscando imágenes verticales: '{idea}'")
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            data = self._buscar_pexels(url, params)
             
-            if response.status_code != 200:
-                print(f"   ⚠️ Error API Pexels: {response.status_code}")
+            if data is None:
                 return []
             
-            data = response.json()
-            imagenes = []
-            
             if 'photos' not in data or len(data['photos']) == 0:
                 print(f"   ⚠️ No se encontraron imágenes para '{idea}'")
                 return []
             
-            for photo in data['photos'][:cantidad]:
-                try:
-                    img_url = photo['src']['large2x']
-                    img_response = requests.get(img_url, timeout=10)
-                    if img_response.status_code == 200:
-                        img = Image.open(BytesIO(img_response.content))
-                        # Recortar a 9:16 centrado
-                        img = self.recortar_a_vertical(img)
-                        imagenes.append(img)
-                except:
-                    continue
+            def descargar(photo):
+                clave = CacheMedios.clave("pexels", "foto", photo['id'], "large2x")
+                img_path = self.cache.obtener(clave)
+                if img_path is None:
+                    contenido = self.descargas.descargar_bytes(photo['src']['large2x'], timeout=10)
+                    if contenido is None:
+                        return None
+                    img_path = self.cache.guardar_bytes(clave, contenido, ".jpg")
+                from PIL import Image
+                with Image.open(img_path) as img:
+                    # Recortar a 9:16 centrado
+                    return self.recortar_a_vertical(img.convert('RGB'))
+            
+            # Todas las fotos del resultado se descargan a la vez
+            imagenes = [img for img in self.descargas.mapear(descargar, data['photos'][:cantidad]) if img is not None]
             
             print(f"   ✓ {len(imagenes)} imágenes descargadas")
             return imagenes
@@ -288,6 +449,7 @@ class GeneradorVideoPexels:
     
     def recortar_a_vertical(self, img):
         """Recorta imagen al formato 9:16 (1080x1920) CENTRADO"""
+        from PIL import Image
         width, height = img.size
         target_ratio = 9 / 16  # 0.5625
         current_ratio = width / height
@@ -307,6 +469,55 @@ class GeneradorVideoPexels:
         img = img.resize(self.resolucion, Image.LANCZOS)
         return img
     
+    def seleccionar_rendicion(self, video_files, duracion=None):
+        """
+        Elige la rendición más barata que todavía llena el encuadre 9:16
+        
+        Ordena los archivos por coste estimado (píxeles × fps, que es lo que se
+        descarga y decodifica) y devuelve el más barato cuyo recorte centrado a
+        9:16 cubre self.resolucion sin ampliar. Si ninguno lo cubre, devuelve el
+        que menos haya que ampliar.
+        
+        Args:
+            video_files (list): Entradas 'video_files' de la API de Pexels
+            duracion (float): Duración del clip en segundos (para estimar el tamaño)
+        """
+        ancho, alto = self.resolucion
+        ratio = ancho / alto
+        max_bytes = self.MAX_MB_POR_CLIP * 1024 * 1024
+        
+        candidatos = []
+        for vf in video_files:
+            w, h = vf.get('width'), vf.get('height')
+            if not w or not h or vf.get('file_type', 'video/mp4') != 'video/mp4':
+                continue
+            
+            # Tamaño útil tras recortar al centro en 9:16
+            recorte_w = min(w, h * ratio)
+            recorte_h = min(h, w / ratio)
+            escala = min(recorte_w / ancho, recorte_h / alto)
+            
+            fps = vf.get('fps') or 30
+            coste = w * h * fps
+            # Pexels no siempre da el tamaño: ~0.1 bits por píxel en H.264
+            bytes_estimados = vf.get('size') or coste * (duracion or 0) * 0.1 / 8
+            
+            candidatos.append({
+                'vf': vf, 'escala': escala, 'coste': coste,
+                'cabe': bytes_estimados <= max_bytes
+            })
+        
+        if not candidatos:
+            return video_files[0] if video_files else None
+        
+        # Descartar las que superan el límite de descarga (si queda alguna)
+        candidatos = [c for c in candidatos if c['cabe']] or candidatos
+        
+        llenan = [c for c in candidatos if c['escala'] >= 0.98]
+        if llenan:
+            return min(llenan, key=lambda c: c['coste'])['vf']
+        return max(candidatos, key=lambda c: (c['escala'], -c['coste']))['vf']
+    
     def buscar_videos_pexels(self, cantidad=3):
         """Busca videos en Pexels - MODO VERTICAL"""
         if not self.api_key or self.api_key == "TU_API_KEY_AQUI":
@@ -316,7 +527,6 @@ class GeneradorVideoPexels:
         
         try:
             url = "https://api.pexels.com/videos/search"
-            headers = {"Authorization": self.api_key}
             params = {
                 "query": idea,
                 "per_page": cantidad * 2,
@@ -325,42 +535,40 @@ class GeneradorVideoPexels:
             }
             
             print(f"🎥 Buscando videos verticales: '{idea}'")
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            data = self._buscar_pexels(url, params)
             
-            if response.status_code != 200:
-                print(f"   ⚠️ Error API Pexels: {response.status_code}")
+            if data is None:
                 return []
             
-            data = response.json()
-            videos = []
-            
             if 'videos' not in data:
                 print(f"   ⚠️ No se encontraron videos")
                 return []
             
-            for video in data['videos']:
-                if len(videos) >= cantidad:
-                    break
+            def descargar(video):
+                vf = self.seleccionar_rendicion(video['video_files'], video.get('duration'))
                 
-                try:
-                    if video['duration'] < 5:
-                        continue
-                    
-                    vf = video['video_files'][0]
-                    for v in video['video_files']:
-                        if v['quality'] in ['hd', 'sd'] and v['height'] >= 1920:
-                            vf = v
-                            break
-                    
-                    video_url = vf['link']
-                    video_response = requests.get(video_url, timeout=30)
-                    if video_response.status_code == 200:
-                        video_path = os.path.join(self.temp_dir, f"pexels_{len(videos)}.mp4")
-                        with open(video_path, 'wb') as f:
-                            f.write(video_response.content)
-                        videos.append(video_path)
-                except:
-                    continue
+                clave = CacheMedios.clave("pexels", "video", video['id'], vf.get('id'), vf['width'], vf['height'])
+                video_path = self.cache.obtener(clave)
+                if video_path is None:
+                    # Descarga por trozos directa a disco: la memoria no depende del tamaño del clip
+                    destino = os.path.join(self.temp_dir, f"pexels_{video['id']}.mp4")
+                    descargado = self.descargas.descargar_a_archivo(
+                        vf['link'], destino,
+                        max_bytes=self.MAX_MB_POR_CLIP * 1024 * 1024,
+                        timeout=30
+                    )
+                    if descargado is None:
+                        return None
+                    video_path = self.cache.guardar_archivo(clave, descargado, ".mp4")
+                return video_path
+            
+            candidatos = [v for v in data['videos'] if v.get('duration', 0) >= 5]
+            videos = []
+            
+            # Descargar en tandas paralelas; si alguno falla se prueba con los siguientes
+            while candidatos and len(videos) < cantidad:
+                tanda, candidatos = candidatos[:cantidad - len(videos)], candidatos[cantidad - len(videos):]
+                videos.extend(p for p in self.descargas.mapear(descargar, tanda) if p)
             
             print(f"   ✓ {len(videos)} videos descargados")
             return videos
@@ -369,169 +577,94 @@ class GeneradorVideoPexels:
             return []
     
     def generar_paleta_colores(self, tema):
-        """Genera paleta de colores"""
-        return [(72, 61, 139), (218, 165, 32), (255, 248, 220)]
-    
-    def generar_imagen_abstracta(self, paleta):
-        """Genera imagen abstracta VERTICAL"""
-        img = Image.new('RGB', self.resolucion, paleta[0])
-        draw = ImageDraw.Draw(img)
-        for _ in range(20):
-            x = random.randint(0, self.resolucion[0])
-            y = random.randint(0, self.resolucion[1])
-            r = random.randint(50, 300)
-            draw.ellipse([x-r, y-r, x+r, y+r], fill=random.choice(paleta))
-        return img
+        """Genera paleta de colores derivada del tema (siempre la misma para el mismo tema)"""
+        from fondos import paleta_desde_tema
+        return paleta_desde_tema(tema)
+    
+    def generar_imagen_abstracta(self, paleta, variante=0):
+        """
+        Genera imagen abstracta VERTICAL
+        
+        Fondo procedural de fondos.py (degradado, ruido y manchas en NumPy),
+        determinista para la paleta y la variante: cada segmento usa una
+        variante distinta
+        """
+        from fondos import FondoProcedural, semilla_de
+        return FondoProcedural(self.resolucion, paleta, semilla_de(paleta, variante)).imagen()
+    
+    def generar_fondo_animado(self, paleta, duracion, variante=0):
+        """Clip con el fondo abstracto animado (las manchas se desplazan suavemente)"""
+        from fondos import FondoProcedural, semilla_de
+        from moviepy.editor import VideoClip
+        fondo = FondoProcedural(self.resolucion, paleta, semilla_de(paleta, variante))
+        return VideoClip(fondo.cuadro, duration=duracion)
     
     def aplicar_efecto(self, clip, efecto, dur):
-        """Aplica efectos al clip"""
+        """
+        Aplica efectos al clip
+        
+        Zoom y paneo usan el motor Ken Burns de efectos.py: la imagen se escala
+        una sola vez y cada fotograma es una ventana de ella
+        """
         try:
-            if efecto == 'zoom_in':
-                return clip.resize(lambda t: 1 + 0.3 * (t / dur))
-            elif efecto == 'zoom_out':
-                return clip.resize(lambda t: 1.3 - 0.3 * (t / dur))
+            from efectos import KenBurns, EFECTOS_KEN_BURNS
+            if efecto in EFECTOS_KEN_BURNS:
+                from moviepy.editor import VideoClip
+                kb = KenBurns(clip.get_frame(0), self.resolucion, efecto, dur)
+                return VideoClip(kb.cuadro, duration=dur)
         except:
             pass
         return clip.fadein(0.3).fadeout(0.3)
     
     def generar_audio(self, texto):
         """Genera audio con TTS - VOZ GRAVE Y PAUSADA"""
-        audio_path = os.path.join(self.temp_dir, f"audio_{hash(texto)}.mp3")
-        
-        if TIENE_EDGE_TTS:
-            try:
-                import sys
-                if sys.platform == 'win32':
-                    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-                
-                async def gen():
-                    # Voz más grave (-25Hz) y más lenta (-15%)
-                    comm = edge_tts.Communicate(
-                        texto, 
-                        "es-ES-AlvaroNeural",
-                        rate="-15%",   # Más lenta
-                        pitch="-25Hz"  # Más grave
-                    )
-                    await comm.save(audio_path)
-                
-                asyncio.run(gen())
-                audio_clip = AudioFileClip(audio_path)
-                dur = audio_clip.duration
-                audio_clip.close()
-                return audio_path, dur
-            except:
-                pass
+        return self.generar_audios([texto])[0]
+    
+    def generar_audios(self, textos):
+        """
+        Genera los audios de varios textos a la vez (un solo event loop de edge-tts)
         
-        tts = gTTS(text=texto, lang='es', slow=True)
-        tts.save(audio_path)
-        audio_clip = AudioFileClip(audio_path)
-        dur = audio_clip.duration
-        audio_clip.close()
-        return audio_path, dur
+        Returns:
+            list: [(audio_path, duracion)] en el orden de textos
+        """
+        return self.voz.sintetizar(textos)
     
     def crear_texto(self, frase, duracion):
         """
         Crea texto SIEMPRE CENTRADO PERFECTAMENTE
         Optimizado para formato vertical de Instagram
-        """
-        # Cargar fuente con tamaño ajustado para vertical
-        try:
-            # Tamaño de fuente más grande para pantalla vertical
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 60)
-        except:
-            try:
-                font = ImageFont.truetype("arial.ttf", 60)
-            except:
-                font = ImageFont.load_default()
-        
-        # Crear imagen transparente del tamaño del video
-        img = Image.new('RGBA', self.resolucion, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # MÁRGENES LATERALES - Más pequeños para formato vertical
-        margen_lateral = 100  # 50px a cada lado (total 100px)
-        max_width = self.resolucion[0] - margen_lateral
-        
-        # DIVIDIR TEXTO EN LÍNEAS
-        palabras = frase.split()
-        lines = []
-        current_line = ""
-        
-        for palabra in palabras:
-            test_line = (current_line + " " + palabra).strip()
-            
-            # Medir el ancho del texto
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            test_width = bbox[2] - bbox[0]
-            
-            if test_width <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                    current_line = palabra
-                else:
-                    # Si una sola palabra es muy larga, la dividimos
-                    lines.append(palabra)
-                    current_line = ""
-        
-        if current_line:
-            lines.append(current_line)
-        
-        if not lines:
-            lines = [frase]
-        
-        # CALCULAR POSICIÓN CENTRADA
-        center_x = self.resolucion[0] // 2  # Centro horizontal (540)
-        center_y = self.resolucion[1] // 2  # Centro vertical (960)
-        
-        # Altura de línea con espacio entre líneas
-        line_height = 80
-        
-        # Calcular altura total del bloque de texto
-        total_height = len(lines) * line_height
-        
-        # Calcular posición Y inicial para centrar el bloque completo
-        start_y = center_y - (total_height // 2) + (line_height // 2)
-        
-        # DIBUJAR CADA LÍNEA CENTRADA
-        for i, line in enumerate(lines):
-            y_pos = start_y + (i * line_height)
-            
-            # SOMBRA para mejor legibilidad
-            shadow_offset = 3
-            for dx in range(-shadow_offset, shadow_offset + 1):
-                for dy in range(-shadow_offset, shadow_offset + 1):
-                    if dx != 0 or dy != 0:
-                        draw.text(
-                            (center_x + dx, y_pos + dy),
-                            line,
-                            font=font,
-                            fill=(0, 0, 0, 200),  # Sombra negra semi-transparente
-                            anchor='mm'  # CENTRADO: Middle-Middle
-                        )
-            
-            # TEXTO PRINCIPAL CENTRADO
-            draw.text(
-                (center_x, y_pos),
-                line,
-                font=font,
-                fill=(255, 255, 255, 255),  # Blanco sólido
-                anchor='mm'  # CENTRADO: Middle-Middle
-            )
         
-        # Guardar imagen temporal
-        path = os.path.join(self.temp_dir, f"txt_{hash(frase)}.png")
-        img.save(path)
+        La capa se genera en memoria, recortada a la caja del texto, y se
+        coloca en su posición del fotograma (sin PNG intermedio a 1080x1920)
+        """
+        from moviepy.editor import ImageClip
+        capa = self.texto.renderizar(frase)
         
-        # Crear clip de video con la imagen de texto
-        clip = ImageClip(path, duration=duracion, transparent=True)
+        mascara = ImageClip(capa.alfa, ismask=True, duration=duracion)
+        clip = ImageClip(capa.rgb, duration=duracion).set_mask(mascara).set_position(capa.posicion)
         
         # Aplicar fade in/out suave
         return [clip.fadein(0.3).fadeout(0.3)]
     
+    def componer_con_texto(self, clip_fondo, frase, duracion):
+        """Superpone el texto de la frase mezclando solo la región que ocupa"""
+        from texto_overlay import superponer_texto
+        capa = self.texto.renderizar(frase)
+        return superponer_texto(clip_fondo, capa, duracion)
+    
     def ajustar_video_vertical(self, video_clip, duracion):
-        """Ajusta un video al formato vertical 9:16 recortando y centrando"""
+        """
+        Ajusta un video al formato vertical 9:16 recortando y centrando
+        
+        Con la ruta del video, ffmpeg escala, recorta y fija los FPS al
+        decodificar y los bucles se decodifican una sola vez (decodificador.py).
+        Con un clip de MoviePy ya abierto se recorta y redimensiona en Python.
+        """
+        if isinstance(video_clip, str):
+            from decodificador import ClipVertical
+            return ClipVertical(video_clip, self.resolucion, duracion,
+                                fps=self.FPS_SALIDA, directorio=self.temp_dir)
+        
         w, h = video_clip.size
         target_ratio = 9 / 16
         current_ratio = w / h
@@ -558,107 +691,201 @@ class GeneradorVideoPexels:
         
         return video_clip
     
-    def generar_video(self, archivo_salida=None, usar_videos=True, usar_imagenes=True):
-        """Genera video VERTICAL para Instagram con texto SIEMPRE CENTRADO"""
+    def parametros_exportacion(self, perfil=None, threads=None):
+        """
+        Argumentos de write_videofile para un perfil de PERFILES_EXPORTACION
+        
+        Args:
+            perfil (str): 'fast', 'balanced' o 'archive' (default: PERFIL_DEFAULT)
+            threads (int): Fuerza el número de hilos de x264 (p.ej. por proceso)
+        """
+        nombre = perfil or self.PERFIL_DEFAULT
+        if nombre not in self.PERFILES_EXPORTACION:
+            raise ValueError(f"Perfil de exportación desconocido: {nombre} "
+                             f"(disponibles: {', '.join(self.PERFILES_EXPORTACION)})")
+        p = self.PERFILES_EXPORTACION[nombre]
+        
+        ffmpeg_params = ['-g', str(p['gop'])]
+        if p['crf'] is not None:
+            ffmpeg_params += ['-crf', str(p['crf'])]
+        if p['tune']:
+            ffmpeg_params += ['-tune', p['tune']]
+        
+        return {
+            'fps': self.FPS_SALIDA,
+            'codec': 'libx264',
+            'audio_codec': 'aac',
+            'preset': p['preset'],
+            'bitrate': p['bitrate'],
+            'threads': threads or p['threads'] or os.cpu_count(),
+            'ffmpeg_params': ffmpeg_params,
+            'verbose': False,
+            'logger': None
+        }
+    
+    def benchmark_perfiles(self, duracion=5, perfiles=None):
+        """
+        Mide cada perfil de exportación sobre un clip sintético con movimiento
+        
+        Returns:
+            dict: {perfil: {'segundos_por_segundo': ..., 'tamanio_mb': ...}}
+        """
+        fondo = self.generar_fondo_animado(self.generar_paleta_colores("benchmark"), duracion)
+        clip = self.componer_con_texto(fondo, "Respira, suelta y vuelve al momento presente", duracion)
+        
         print(f"\n{'='*70}")
-        print(f"🎬 GENERANDO VIDEO VERTICAL PARA INSTAGRAM - {self.fecha_legible}")
-        print(f"📱 Formato: {self.resolucion[0]}x{self.resolucion[1]} (9:16)")
+        print(f"⏱️  BENCHMARK DE PERFILES DE EXPORTACIÓN ({duracion}s de video)")
+        print(f"{'='*70}")
+        
+        resultados = {}
+        for perfil in perfiles or self.PERFILES_EXPORTACION:
+            salida = os.path.join(self.temp_dir, f"bench_{perfil}.mp4")
+            params = self.parametros_exportacion(perfil)
+            params['audio_codec'] = None
+            
+            inicio = time.perf_counter()
+            clip.write_videofile(salida, audio=False, **params)
+            segundos = time.perf_counter() - inicio
+            
+            resultados[perfil] = {
+                'segundos_por_segundo': round(segundos / duracion, 3),
+                'tamanio_mb': round(os.path.getsize(salida) / 1024 / 1024, 2)
+            }
+            print(f"   {perfil:<10} {resultados[perfil]['segundos_por_segundo']:>7.3f} s/s   "
+                  f"{resultados[perfil]['tamanio_mb']:>7.2f} MB")
+        
         print(f"{'='*70}\n")
+        return resultados
+    
+    def _obtener_imagen_intro(self, paleta, usar_imagenes):
+        """Imagen de fondo de la intro guardada en temp_dir"""
+        imgs = self.buscar_imagenes_pexels(1) if usar_imagenes else []
+        img = imgs[0] if imgs else self.generar_imagen_abstracta(paleta)
+        img_path = os.path.join(self.temp_dir, "intro.jpg")
+        img.save(img_path)
+        return img_path
+    
+    def _obtener_videos(self, usar_videos):
+        """Clips de Pexels que ffmpeg puede abrir (solo se leen las cabeceras, sin decodificar)"""
+        if not usar_videos:
+            return []
         
-        tema, frases = self.leer_mindfulness_json()
+        from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+        validos = []
+        for vp in self.buscar_videos_pexels(3):
+            try:
+                infos = ffmpeg_parse_infos(vp)
+                if infos.get('video_found') and infos.get('duration') and all(infos.get('video_size') or [0]):
+                    validos.append(vp)
+            except:
+                pass
+        return validos
+    
+    def _completar_visuales(self, videos, paleta, usar_imagenes):
+        """Completa hasta 3 fondos con imágenes (una sola búsqueda) o abstractos"""
+        clips_visuales = [('video', vp) for vp in videos]
         
-        if len(frases) < 3:
-            raise ValueError("❌ Error: Se necesitan al menos 3 frases en el JSON")
+        faltan = 3 - len(clips_visuales)
+        if faltan > 0:
+            imgs = self.buscar_imagenes_pexels(faltan) if usar_imagenes else []
+            imgs = imgs[:faltan]
+            while len(imgs) < faltan:
+                imgs.append(self.generar_imagen_abstracta(paleta, variante=len(clips_visuales) + len(imgs) + 1))
+            for img in imgs:
+                img_path = os.path.join(self.temp_dir, f"img{len(clips_visuales) + 1}.jpg")
+                img.save(img_path)
+                clips_visuales.append(('imagen', img_path))
         
-        # Nombre único para el archivo
-        if archivo_salida is None:
-            tema_limpio = tema.lower().replace(" ", "_").replace("á", "a").replace("é", "e").replace("í", "i").replace("ó", "o").replace("ú", "u")[:20]
-            archivo_salida = f"video_{tema_limpio}_{self.fecha_legible}.mp4"
+        return clips_visuales[:3]
+    
+    def _spec_segmento(self, i, texto, audio, visual):
+        """
+        Describe un segmento con datos simples (se puede renderizar en otro proceso)
         
-        print(f"📁 Archivo de salida: {archivo_salida}\n")
+        Args:
+            i (int): 0 para la intro, 1..3 para las frases
+            audio (tuple): (audio_path, duracion)
+            visual: Ruta de la imagen de la intro o lista de (tipo, fuente) de las frases
+        """
+        audio_path, dur = audio
+        tipo, fuente = ('imagen', visual) if i == 0 else visual[i - 1]
         
-        paleta = self.generar_paleta_colores(tema)
+        if i > 0:
+            print(f"\n📝 Segmento {i}/3: {texto[:50]}...")
         
-        # ========== INTRO ==========
-        txt_intro = f"Tres frases sobre {tema}"
-        print(f"🎙️ Generando audio intro...")
-        audio_path, dur = self.generar_audio(txt_intro)
-        audio_clip = AudioFileClip(audio_path)
+        return {
+            'texto': texto, 'audio': audio_path, 'duracion': dur,
+            'tipo': tipo, 'fuente': fuente,
+            'efecto': random.choice(self.EFECTOS) if tipo == 'imagen' else None
+        }
+    
+    def construir_segmento(self, spec):
+        """
+        Construye el clip de un segmento (fondo + texto + audio) a partir de su descripción
         
-        img = self.generar_imagen_abstracta(paleta) if not usar_imagenes else \
-              (self.buscar_imagenes_pexels(1) or [self.generar_imagen_abstracta(paleta)])[0]
+        Args:
+            spec (dict): texto, audio, duracion, tipo ('video'/'imagen'), fuente, efecto
+        """
+        from moviepy.editor import AudioFileClip, ImageClip
+        dur = spec['duracion']
+        audio_clip = AudioFileClip(spec['audio'])
         
-        img_path = os.path.join(self.temp_dir, "intro.jpg")
-        img.save(img_path)
+        if spec['tipo'] == 'video':
+            # Ajustar al formato vertical
+            clip_fondo = self.ajustar_video_vertical(spec['fuente'], dur)
+        elif self.es_estatico(spec):
+            # Imagen con fundido: el fotograma central se compone una sola vez
+            return self.segmento_estatico(spec['fuente'], spec['texto'], dur).set_audio(audio_clip)
+        else:
+            clip_fondo = ImageClip(spec['fuente'], duration=dur)
+            clip_fondo = self.aplicar_efecto(clip_fondo, spec['efecto'], dur)
         
-        img_clip = ImageClip(img_path, duration=dur)
-        img_clip = self.aplicar_efecto(img_clip, random.choice(self.EFECTOS), dur)
-        txt_clips = self.crear_texto(txt_intro, dur)
+        # Todos los segmentos deben medir exactamente self.resolucion
+        if tuple(clip_fondo.size) != tuple(self.resolucion):
+            clip_fondo = clip_fondo.crop(
+                x_center=clip_fondo.w / 2, y_center=clip_fondo.h / 2,
+                width=self.resolucion[0], height=self.resolucion[1]
+            )
         
-        seg_intro = CompositeVideoClip([img_clip] + txt_clips).set_audio(audio_clip)
-        segmentos = [seg_intro]
+        return self.componer_con_texto(clip_fondo, spec['texto'], dur).set_audio(audio_clip)
+    
+    @staticmethod
+    def es_estatico(spec):
+        """True si el segmento no cambia con el tiempo salvo los fundidos (imagen sin zoom ni paneo)"""
+        from efectos import EFECTOS_KEN_BURNS
+        return spec['tipo'] == 'imagen' and spec['efecto'] not in EFECTOS_KEN_BURNS
+    
+    def segmento_estatico(self, ruta_imagen, frase, duracion):
+        """
+        Clip de una imagen fija con el texto ya mezclado
         
-        # ========== OBTENER CONTENIDO VISUAL ==========
-        clips_visuales = []
+        Equivale a aplicar_efecto(..., 'fade') + componer_con_texto, pero el
+        fotograma se compone una vez y el codificador recibe siempre el mismo.
+        """
+        from PIL import Image
+        from moviepy.editor import VideoClip
+        from texto_overlay import fotogramas_estaticos
+        import numpy as np
         
-        if usar_videos:
-            videos = self.buscar_videos_pexels(3)
-            for vp in videos:
-                try:
-                    clips_visuales.append(('video', VideoFileClip(vp)))
-                except:
-                    pass
-        
-        # Completar con imágenes
-        while len(clips_visuales) < 3:
-            if usar_imagenes:
-                imgs = self.buscar_imagenes_pexels(1)
-                img = imgs[0] if imgs else self.generar_imagen_abstracta(paleta)
-            else:
-                img = self.generar_imagen_abstracta(paleta)
-            clips_visuales.append(('imagen', img))
-        
-        clips_visuales = clips_visuales[:3]
-        
-        # ========== PROCESAR FRASES ==========
-        for i, (frase, (tipo, contenido)) in enumerate(zip(frases, clips_visuales), 1):
-            print(f"\n📝 Segmento {i}/3: {frase[:50]}...")
-            
-            audio_path, dur = self.generar_audio(frase)
-            audio_clip = AudioFileClip(audio_path)
-            
-            if tipo == 'video':
-                video_clip = contenido
-                # Ajustar al formato vertical
-                video_clip = self.ajustar_video_vertical(video_clip, dur)
-                clip_fondo = video_clip
-            else:
-                img = contenido
-                img_path = os.path.join(self.temp_dir, f"img{i}.jpg")
-                img.save(img_path)
-                img_clip = ImageClip(img_path, duration=dur)
-                img_clip = self.aplicar_efecto(img_clip, random.choice(self.EFECTOS), dur)
-                clip_fondo = img_clip
+        with Image.open(ruta_imagen) as img:
+            fondo = np.asarray(self.recortar_a_vertical(img.convert('RGB')))
+        capa = self.texto.renderizar(frase)
+        return VideoClip(fotogramas_estaticos(fondo, capa, duracion), duration=duracion)
+    
+    def exportar_secuencial(self, specs, archivo_salida, perfil=None):
+        """Une todos los segmentos y los codifica en una sola pasada"""
+        from moviepy.editor import concatenate_videoclips
+        with self._etapa('componer'):
+            segmentos = [self.construir_segmento(spec) for spec in specs]
             
-            txt_clips = self.crear_texto(frase, dur)
-            seg = CompositeVideoClip([clip_fondo] + txt_clips).set_audio(audio_clip)
-            segmentos.append(seg)
+            print("\n🎞️ Uniendo segmentos...")
+            # Todos miden self.resolucion: 'chain' entrega el fotograma de cada
+            # segmento tal cual, sin recomponerlo sobre un lienzo
+            video_final = concatenate_videoclips(segmentos, method="chain")
         
-        # ========== UNIR Y EXPORTAR ==========
-        print("\n🎞️ Uniendo segmentos...")
-        video_final = concatenate_videoclips(segmentos, method="compose")
-        
-        print(f"\n💾 Exportando video vertical...")
-        video_final.write_videofile(
-            archivo_salida,
-            fps=30,  # 30 FPS para Instagram
-            codec='libx264',
-            audio_codec='aac',
-            preset='medium',
-            bitrate='5000k',  # Mejor calidad
-            verbose=False,
-            logger=None
-        )
+        print(f"\n💾 Exportando video vertical (perfil: {perfil or self.PERFIL_DEFAULT})...")
+        with self._etapa('exportar'):
+            video_final.write_videofile(archivo_salida, **self.parametros_exportacion(perfil))
         
         video_final.close()
         for seg in segmentos:
@@ -666,6 +893,214 @@ class GeneradorVideoPexels:
                 seg.close()
             except:
                 pass
+    
+    def exportar_en_paralelo(self, plan, num_segmentos, archivo_salida, perfil=None, procesos=None):
+        """
+        Codifica cada segmento en su propio proceso y los une sin recodificar
+        
+        Añade al plan una etapa 'segmento_i' por segmento que depende de
+        'spec_i', así cada segmento empieza a codificarse en cuanto su
+        descripción está lista, y ejecuta el plan. Todos los segmentos usan
+        exactamente los mismos parámetros de códec, así que el concat de ffmpeg
+        con '-c copy' solo reescribe el contenedor.
+        """
+        procesos, hilos = self._reparto_procesos(num_segmentos, procesos)
+        
+        rutas = [os.path.join(self.temp_dir, f"segmento_{i}.mp4") for i in range(num_segmentos)]
+        
+        print(f"\n💾 Exportando {num_segmentos} segmentos en {procesos} procesos "
+              f"(perfil: {perfil or self.PERFIL_DEFAULT})...")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=_CONTEXTO_PROCESOS) as pool:
+            for i, ruta in enumerate(rutas):
+                plan.agregar(
+                    f'segmento_{i}',
+                    lambda spec, ruta=ruta: pool.submit(
+                        _exportar_segmento, self.resolucion, spec, ruta, perfil, hilos
+                    ).result(),
+                    depende_de=(f'spec_{i}',)
+                )
+            plan.ejecutar()
+        
+        print("\n🎞️ Uniendo segmentos (sin recodificar)...")
+        with self._etapa('concat'):
+            self.concatenar_sin_recodificar(rutas, archivo_salida)
+    
+    @staticmethod
+    def _reparto_procesos(num_segmentos, procesos=None):
+        """(procesos, hilos de x264 por proceso) sin sobresuscribir la CPU"""
+        procesos = procesos or min(num_segmentos, os.cpu_count() or 1)
+        hilos = max(1, (os.cpu_count() or 1) // procesos)
+        return procesos, hilos
+    
+    def concatenar_sin_recodificar(self, rutas, archivo_salida):
+        """Une archivos MP4 con el demuxer concat de ffmpeg copiando los streams"""
+        from moviepy.config import get_setting
+        lista = os.path.join(self.temp_dir, "concat.txt")
+        with open(lista, 'w', encoding='utf-8') as f:
+            for ruta in rutas:
+                ruta_ffmpeg = os.path.abspath(ruta).replace("\\", "/").replace("'", "'\\''")
+                f.write(f"file '{ruta_ffmpeg}'\n")
+        
+        cmd = [
+            get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', lista,
+            '-c', 'copy', '-movflags', '+faststart', archivo_salida
+        ]
+        resultado = subprocess.run(cmd, capture_output=True, text=True)
+        if resultado.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat falló: {resultado.stderr.strip()}")
+    
+    @staticmethod
+    def _limpiar_tema(tema):
+        """Tema apto para un nombre de archivo: minúsculas sin tildes, solo letras, números y '_'"""
+        tema = unicodedata.normalize('NFKD', str(tema).lower())
+        tema = ''.join(c for c in tema if not unicodedata.combining(c))
+        return re.sub(r'[^a-z0-9]+', '_', tema).strip('_')[:20] or "mindfulness"
+    
+    def _nombre_salida(self, tema):
+        """Nombre único del video a partir del tema y la fecha"""
+        return f"video_{self._limpiar_tema(tema)}_{self.fecha_legible}.mp4"
+    
+    def describir_ejecucion(self, archivo_salida=None, usar_videos=True, usar_imagenes=True,
+                            perfil=None, paralelo=False, procesos=None):
+        """
+        Muestra lo que haría generar_video sin renderizar, descargar ni subir nada
+        
+        No importa MoviePy: sirve para revisar el JSON y la configuración.
+        
+        Returns:
+            dict: Tema, frases, archivo de salida y parámetros de exportación
+        """
+        tema, frases = self.leer_mindfulness_json(reservar=False)
+        params = self.parametros_exportacion(perfil)
+        fondos = [nombre for nombre, usar in (("videos", usar_videos), ("imagenes", usar_imagenes)) if usar]
+        plan = {
+            "tema": tema,
+            "frases": frases,
+            "archivo_salida": archivo_salida or self._nombre_salida(tema),
+            "resolucion": list(self.resolucion),
+            "fondos": fondos + ["abstractos"],
+            "perfil": perfil or self.PERFIL_DEFAULT,
+            "paralelo": paralelo,
+            "procesos": self._reparto_procesos(len(frases) + 1, procesos)[0] if paralelo else 1,
+            "ffmpeg": {k: params[k] for k in ('fps', 'codec', 'preset', 'bitrate', 'ffmpeg_params')},
+            "tts": "edge-tts" if TIENE_EDGE_TTS else "gtts",
+            "cloudinary": self.cloudinary_configured
+        }
+        
+        print(f"\n{'='*70}")
+        print(f"🧪 DRY RUN - no se genera ni se sube ningún video")
+        print(f"{'='*70}")
+        print(json.dumps(plan, indent=2, ensure_ascii=False))
+        print(f"{'='*70}\n")
+        
+        if len(frases) < 3:
+            print("⚠️ El JSON tiene menos de 3 frases: generar_video fallaría")
+        return plan
+    
+    def generar_video(self, archivo_salida=None, usar_videos=True, usar_imagenes=True, perfil=None,
+                      paralelo=False, procesos=None, tema=None, frases=None, subir=True,
+                      perfilar=None):
+        """
+        Genera video VERTICAL para Instagram con texto SIEMPRE CENTRADO
+        
+        Si no se pasan tema y frases se leen de self.json_path. Cada ejecución,
+        también las que fallan, deja un reporte de métricas por etapa en
+        metricas/ (ver instrumentacion.py).
+        
+        Args:
+            perfilar (str): None, 'cprofile' o 'tracemalloc'
+        """
+        # Marca de tiempo propia de este video (un mismo proceso puede generar varios)
+        self.timestamp = int(time.time())
+        self.fecha_legible = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        self.metricas = Instrumentacion("video", perfilar=perfilar)
+        self.descargas.al_transferir = self.metricas.sumar_bytes
+        self.voz.al_transferir = self.metricas.sumar_bytes
+        try:
+            return self._generar_video(archivo_salida, usar_videos, usar_imagenes, perfil,
+                                       paralelo, procesos, tema, frases, subir)
+        except Exception as e:
+            self.metricas.extra["error"] = repr(e)
+            raise
+        finally:
+            # Si el video no llegó a exportarse, sus frases vuelven al búfer
+            self._cerrar_reserva(usado=False)
+            # El perfil se detiene y el reporte se escribe aunque el video falle
+            self.descargas.al_transferir = None
+            self.voz.al_transferir = None
+            try:
+                print(self.metricas.resumen())
+                print(f"📈 Métricas: {self.metricas.guardar()}\n")
+            except Exception as e:
+                print(f"⚠️ No se pudo guardar el reporte de métricas: {e}")
+    
+    def _generar_video(self, archivo_salida, usar_videos, usar_imagenes, perfil, paralelo, procesos,
+                       tema, frases, subir):
+        """Cuerpo de generar_video (las métricas ya están activas)"""
+        print(f"\n{'='*70}")
+        print(f"🎬 GENERANDO VIDEO VERTICAL PARA INSTAGRAM - {self.fecha_legible}")
+        print(f"📱 Formato: {self.resolucion[0]}x{self.resolucion[1]} (9:16)")
+        print(f"{'='*70}\n")
+        
+        if tema is None or frases is None:
+            with self._etapa('leer_json'):
+                tema, frases = self.leer_mindfulness_json()
+        frases = list(frases)[:3]
+        
+        if len(frases) < 3:
+            raise ValueError("❌ Error: Se necesitan al menos 3 frases en el JSON")
+        
+        # Nombre único para el archivo
+        archivo_salida = archivo_salida or self._nombre_salida(tema)
+        
+        print(f"📁 Archivo de salida: {archivo_salida}\n")
+        
+        paleta = self.generar_paleta_colores(tema)
+        
+        txt_intro = f"Tres frases sobre {tema}"
+        textos = [txt_intro] + frases
+        
+        # ========== PLAN DE ETAPAS ==========
+        # Descargas, TTS y texto no dependen entre sí: corren a la vez y cada
+        # segmento arranca en cuanto tiene su audio, su visual y su texto.
+        # En paralelo el texto lo dibuja cada proceso de segmento, no este
+        plan = PlanificadorEtapas(instrumentacion=self.metricas)
+        
+        print(f"🎙️ Generando audios (intro + {len(frases)} frases)...")
+        plan.agregar('audios', lambda: self.generar_audios(textos))
+        plan.agregar('visual_intro', lambda: self._obtener_imagen_intro(paleta, usar_imagenes))
+        plan.agregar('videos', lambda: self._obtener_videos(usar_videos))
+        plan.agregar('visuales', lambda videos: self._completar_visuales(videos, paleta, usar_imagenes),
+                     depende_de=('videos',))
+        
+        for i, texto in enumerate(textos):
+            visual = 'visual_intro' if i == 0 else 'visuales'
+            if paralelo:
+                plan.agregar(
+                    f'spec_{i}',
+                    lambda audios, visual, i=i: self._spec_segmento(i, textos[i], audios[i], visual),
+                    depende_de=('audios', visual)
+                )
+                continue
+            plan.agregar(f'texto_{i}', lambda texto=texto: self.texto.renderizar(texto))
+            plan.agregar(
+                f'spec_{i}',
+                lambda audios, visual, _capa, i=i: self._spec_segmento(i, textos[i], audios[i], visual),
+                depende_de=('audios', visual, f'texto_{i}')
+            )
+        
+        # ========== UNIR Y EXPORTAR ==========
+        if paralelo:
+            self.exportar_en_paralelo(plan, len(textos), archivo_salida, perfil, procesos)
+        else:
+            resultados = plan.ejecutar()
+            specs = [resultados[f'spec_{i}'] for i in range(len(textos))]
+            self.exportar_secuencial(specs, archivo_salida, perfil)
+        
+        # El video ya está en disco: el conjunto del búfer queda gastado
+        self._cerrar_reserva(usado=True)
         
         print(f"\n{'='*70}")
         print(f"✅ VIDEO VERTICAL GENERADO EXITOSAMENTE")
@@ -676,9 +1111,136 @@ class GeneradorVideoPexels:
         print(f"{'='*70}\n")
         
         # SUBIR A CLOUDINARY CON NOMBRE FIJO
-        cloudinary_response = self.subir_a_cloudinary(archivo_salida, tema)
+        cloudinary_response = self.subir_a_cloudinary(archivo_salida, tema) if subir else None
+        
+        self.metricas.extra.update({
+            "archivo": archivo_salida,
+            "tamanio_mb": round(os.path.getsize(archivo_salida) / 1024 / 1024, 2),
+            "perfil": perfil or self.PERFIL_DEFAULT,
+            "paralelo": paralelo,
+            "tema": tema
+        })
         
         return archivo_salida, cloudinary_response
+    
+    @staticmethod
+    def leer_conjuntos_frases(fuentes, errores=None):
+        """
+        Lee conjuntos de frases de varios archivos
+        
+        Acepta archivos .json con el formato de mindfulness.json y archivos
+        .jsonl (o '-' para stdin) con un objeto {"tema", "frases"} por línea.
+        Un archivo o una línea que no se puede leer se informa y se salta: no
+        detiene el resto.
+        
+        Args:
+            fuentes (list): Rutas de archivo o '-'
+            errores (list): Si se pasa, recibe (origen, error) de cada entrada saltada
+        
+        Yields:
+            tuple: (tema, frases)
+        """
+        def conjunto(data):
+            frases = data.get('frases', [])
+            if not isinstance(frases, list):
+                raise ValueError("'frases' no es una lista")
+            return data.get('tema', 'mindfulness'), frases
+        
+        def saltar(origen, e):
+            print(f"❌ Error leyendo {origen}: {e}")
+            if errores is not None:
+                errores.append((origen, e))
+        
+        for fuente in fuentes:
+            if fuente != '-' and not fuente.endswith('.jsonl'):
+                try:
+                    with open(fuente, 'r', encoding='utf-8') as f:
+                        resultado = conjunto(json.load(f))
+                except Exception as e:
+                    saltar(fuente, e)
+                    continue
+                yield resultado
+                continue
+            
+            try:
+                lineas = sys.stdin if fuente == '-' else open(fuente, 'r', encoding='utf-8')
+            except OSError as e:
+                saltar(fuente, e)
+                continue
+            
+            try:
+                for num, linea in enumerate(lineas, 1):
+                    linea = linea.strip()
+                    if not linea:
+                        continue
+                    try:
+                        resultado = conjunto(json.loads(linea))
+                    except Exception as e:
+                        saltar(f"{fuente}:{num}", e)
+                        continue
+                    yield resultado
+            finally:
+                if lineas is not sys.stdin:
+                    lineas.close()
+    
+    def generar_lote(self, fuentes, carpeta_salida=".", subir=False, **kwargs):
+        """
+        Genera un video por cada conjunto de frases en un mismo proceso
+        
+        Caché de medios, sesión HTTP y fuentes se comparten entre videos, así que
+        cada video solo paga su propio render.
+        
+        Args:
+            fuentes (list): Archivos .json / .jsonl (ver leer_conjuntos_frases)
+            carpeta_salida (str): Carpeta donde se guardan los videos
+            subir (bool): Subir cada video a Cloudinary (el public_id es fijo: gana el último)
+            **kwargs: Opciones de generar_video (usar_videos, perfil, paralelo...)
+        
+        Returns:
+            list: [(archivo_salida o None, tema)]; las entradas ilegibles van al final como (None, origen)
+        """
+        os.makedirs(carpeta_salida, exist_ok=True)
+        resultados = []
+        errores = []
+        inicio = time.perf_counter()
+        
+        for n, (tema, frases) in enumerate(self.leer_conjuntos_frases(fuentes, errores), 1):
+            print(f"\n📦 LOTE - video #{n}: {tema}")
+            salida = os.path.join(carpeta_salida, f"video_{n:03d}_{self._limpiar_tema(tema)}.mp4")
+            try:
+                archivo, _ = self.generar_video(salida, tema=tema, frases=frases, subir=subir, **kwargs)
+                resultados.append((archivo, tema))
+            except Exception as e:
+                print(f"❌ Error en el video #{n} ({tema}): {e}")
+                resultados.append((None, tema))
+        
+        # Las entradas ilegibles cuentan como videos fallidos
+        resultados.extend((None, origen) for origen, _ in errores)
+        
+        total = time.perf_counter() - inicio
+        correctos = sum(1 for archivo, _ in resultados if archivo)
+        print(f"\n{'='*70}")
+        print(f"📦 LOTE COMPLETADO: {correctos}/{len(resultados)} videos en {total:.1f}s")
+        if correctos:
+            print(f"⏱️  Promedio: {total / len(resultados):.1f}s por video")
+        print(f"{'='*70}\n")
+        return resultados
+
+
+# 'spawn' en vez de 'fork': el proceso padre tiene hilos vivos (planificador,
+# descargas) y un fork puede heredar un lock tomado y quedarse colgado
+_CONTEXTO_PROCESOS = multiprocessing.get_context('spawn')
+
+
+def _exportar_segmento(resolucion, spec, salida, perfil, hilos):
+    """Renderiza un segmento en un proceso aparte (ver exportar_en_paralelo)"""
+    gen = GeneradorVideoPexels(resolucion=resolucion, usar_cloudinary=False)
+    clip = gen.construir_segmento(spec)
+    try:
+        clip.write_videofile(salida, **gen.parametros_exportacion(perfil, threads=hilos))
+    finally:
+        clip.close()
+    return salida
 
 
 if __name__ == "__main__":
@@ -692,8 +1254,29 @@ if __name__ == "__main__":
     parser.add_argument('--pexels-key', default=None, help='API Key de Pexels')
     parser.add_argument('-o', '--output', default=None, help='Nombre del archivo de salida')
     parser.add_argument('--json', default='mindfulness.json', help='Archivo JSON con el tema y frases')
+    parser.add_argument('--almacen', nargs='?', const='', default=None, metavar='DB',
+                        help='Sacar tema y frases del búfer de frases (almacén SQLite de generador_mindfulness.py, '
+                             'default: frases.db); si está vacío se usa el JSON')
     parser.add_argument('--solo-imagenes', action='store_true', help='Usar solo imágenes')
     parser.add_argument('--solo-videos', action='store_true', help='Usar solo videos')
+    parser.add_argument('--perfil', choices=list(GeneradorVideoPexels.PERFILES_EXPORTACION),
+                        default=GeneradorVideoPexels.PERFIL_DEFAULT, help='Perfil de exportación x264')
+    parser.add_argument('--paralelo', action='store_true',
+                        help='Codificar cada segmento en un proceso y unirlos sin recodificar')
+    parser.add_argument('--procesos', type=int, default=None, help='Procesos para --paralelo (default: núcleos)')
+    parser.add_argument('--lote', nargs='+', metavar='ARCHIVO',
+                        help='Generar un video por cada conjunto de frases (.json, .jsonl o - para stdin)')
+    parser.add_argument('--carpeta-lote', default='.', help='Carpeta de salida del modo --lote')
+    parser.add_argument('--subir-lote', action='store_true', help='Subir a Cloudinary cada video del lote')
+    parser.add_argument('--perfilar', choices=['cprofile', 'tracemalloc'], default=None,
+                        help='Adjuntar un perfil cProfile o tracemalloc al reporte de métricas')
+    parser.add_argument('--benchmark-perfiles', action='store_true',
+                        help='Medir segundos de codificación y tamaño de cada perfil y salir')
+    parser.add_argument('--upload-only', metavar='VIDEO', default=None,
+                        help='Subir a Cloudinary un video ya generado y salir (no carga MoviePy)')
+    parser.add_argument('--tema', default=None, help='Tema para --upload-only (default: el del JSON)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Mostrar tema, frases y parámetros sin generar nada (no carga MoviePy)')
     
     args = parser.parse_args()
     
@@ -708,13 +1291,55 @@ if __name__ == "__main__":
             json_path=args.json,
             cloudinary_cloud_name=args.cloudinary_name,
             cloudinary_api_key=args.cloudinary_key,
-            cloudinary_api_secret=args.cloudinary_secret
+            cloudinary_api_secret=args.cloudinary_secret,
+            usar_cloudinary=not args.dry_run,
+            almacen_frases=args.almacen
         )
         
+        if args.dry_run:
+            gen.describir_ejecucion(
+                archivo_salida=args.output,
+                usar_videos=not args.solo_imagenes,
+                usar_imagenes=not args.solo_videos,
+                perfil=args.perfil,
+                paralelo=args.paralelo,
+                procesos=args.procesos
+            )
+            sys.exit(0)
+        
+        if args.upload_only:
+            tema = args.tema or gen.leer_mindfulness_json(reservar=False)[0]
+            sys.exit(0 if gen.subir_a_cloudinary(args.upload_only, tema) else 1)
+        
+        if not TIENE_MOVIEPY:
+            print("Error: No se puede importar MoviePy (pip install moviepy)")
+            sys.exit(1)
+        
+        if args.benchmark_perfiles:
+            gen.benchmark_perfiles()
+            sys.exit(0)
+        
+        if args.lote:
+            resultados = gen.generar_lote(
+                args.lote,
+                carpeta_salida=args.carpeta_lote,
+                subir=args.subir_lote,
+                usar_videos=not args.solo_imagenes,
+                usar_imagenes=not args.solo_videos,
+                perfil=args.perfil,
+                paralelo=args.paralelo,
+                procesos=args.procesos
+            )
+            sys.exit(0 if all(archivo for archivo, _ in resultados) else 1)
+        
         gen.generar_video(
             archivo_salida=args.output,
             usar_videos=not args.solo_imagenes,
-            usar_imagenes=not args.solo_videos
+            usar_imagenes=not args.solo_videos,
+            perfil=args.perfil,
+            paralelo=args.paralelo,
+            procesos=args.procesos,
+            perfilar=args.perfilar
         )
         
         print(f"\n{'='*70}")